@@ -8,6 +8,9 @@ logger = logging.getLogger(__name__)
 class Database:
     client: AsyncIOMotorClient = None
     db_name: str = None
+    db = None
+    # Collection handles resolved once and reused by the getters below
+    collections: dict = {}
 
 database = Database()
 
@@ -30,12 +33,18 @@ def _extract_database_name(mongodb_url: str) -> str:
         # If parsing fails, return default
         return "reverba"
 
-async def connect_to_mongo():
-    """Create database connection"""
+async def connect_to_mongo(max_pool_size: int = 100):
+    """Create database connection with up to max_pool_size pooled connections"""
     try:
-        database.client = AsyncIOMotorClient(MONGO_URI)
+        database.client = AsyncIOMotorClient(
+            MONGO_URI,
+            maxPoolSize=max_pool_size,
+            maxIdleTimeMS=60000  # Let connections opened for a burst close once it is over
+        )
         # Extract and store database name
         database.db_name = _extract_database_name(MONGO_URI)
+        database.db = database.client.get_database(database.db_name)
+        database.collections = {}
         # Test the connection
         await database.client.admin.command('ping')
         logger.info(f"Connected to MongoDB successfully (database: {database.db_name})")
@@ -47,45 +56,57 @@ async def close_mongo_connection():
     """Close database connection"""
     if database.client:
         database.client.close()
+        database.db = None
+        database.collections = {}
         logger.info("Disconnected from MongoDB")
 
 def get_database():
     """Get database instance"""
+    if database.db is not None:
+        return database.db
     if database.db_name:
         return database.client.get_database(database.db_name)
     # Fallback: try to get default database or use extracted name
     return database.client.get_database(_extract_database_name(MONGO_URI))
 
+def _get_collection(name: str):
+    """Get a collection handle, resolving it only on first use"""
+    collection = database.collections.get(name)
+    if collection is None:
+        collection = get_database()[name]
+        database.collections[name] = collection
+    return collection
+
 # Collection getters
 def get_users_collection():
-    return get_database().users
+    return _get_collection("users")
 
 def get_refresh_tokens_collection():
-    return get_database().refresh_tokens
+    return _get_collection("refresh_tokens")
 
 def get_words_collection():
-    return get_database().words
+    return _get_collection("words")
 
 def get_daily_tasks_collection():
-    return get_database().daily_tasks
+    return _get_collection("daily_tasks")
 
 def get_tutor_chats_collection():
-    return get_database().tutor_chats
+    return _get_collection("tutor_chats")
 
 def get_cron_runs_collection():
-    return get_database().cron_runs
+    return _get_collection("cron_runs")
 
 def get_otps_collection():
-    return get_database().otps
+    return _get_collection("otps")
 
 def get_password_reset_otps_collection():
-    return get_database().password_reset_otps
+    return _get_collection("password_reset_otps")
 
 def get_password_reset_eligibility_collection():
-    return get_database().password_reset_eligibility
+    return _get_collection("password_reset_eligibility")
 
 def get_email_change_otps_collection():
-    return get_database().email_change_otps
+    return _get_collection("email_change_otps")
 
 def get_email_change_eligibility_collection():
-    return get_database().email_change_eligibility
\ No newline at end of file
+    return _get_collection("email_change_eligibility")
\ No newline at end of file
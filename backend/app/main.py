@@ -45,10 +45,24 @@ async def create_indexes():
         
         # Tutor chats collection
         tutor_chats_collection = get_tutor_chats_collection()
-        await tutor_chats_collection.create_index("userId")
+        await tutor_chats_collection.create_index([("userId", 1), ("wordId", 1), ("taskType", 1), ("createdAt", -1)])
+        await tutor_chats_collection.create_index([("userId", 1), ("finalResult", 1), ("createdAt", -1)])
         await tutor_chats_collection.create_index("wordId")
         logger.info("Indexes created for tutor_chats")
         
+        # OTP and eligibility collections (one entry per user, replaced via upsert)
+        otps_collection = get_otps_collection()
+        await otps_collection.create_index("user_id", unique=True)
+        password_reset_otps_collection = get_password_reset_otps_collection()
+        await password_reset_otps_collection.create_index("user_id", unique=True)
+        password_reset_eligibility_collection = get_password_reset_eligibility_collection()
+        await password_reset_eligibility_collection.create_index("user_id", unique=True)
+        email_change_otps_collection = get_email_change_otps_collection()
+        await email_change_otps_collection.create_index([("user_id", 1), ("otp_type", 1)])
+        email_change_eligibility_collection = get_email_change_eligibility_collection()
+        await email_change_eligibility_collection.create_index("user_id", unique=True)
+        logger.info("Indexes created for OTP and eligibility collections")
+        
     except Exception as e:
         # Index might already exist, which is fine
         logger.warning(f"Index creation warning (may already exist): {e}")
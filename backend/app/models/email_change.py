@@ -1,15 +1,15 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 
 # Request Models
 class EmailChangeOTPVerification(BaseModel):
-    otp: str
+    otp: str = Field(max_length=32)
 
 class NewEmailRequest(BaseModel):
     new_email: EmailStr
 
 class NewEmailOTPVerification(BaseModel):
     new_email: EmailStr
-    otp: str
+    otp: str = Field(max_length=32)
 
 # Response Models
 class EmailChangeResponse(BaseModel):
@@ -1,10 +1,10 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from bson import ObjectId
 
 # Request Models
 class OTPVerification(BaseModel):
     email: EmailStr
-    otp: str
+    otp: str = Field(max_length=32)
 
 class ResendVerification(BaseModel):
     email: EmailStr
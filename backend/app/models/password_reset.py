@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 
 # Request Models
 class PasswordResetRequest(BaseModel):
@@ -6,11 +6,11 @@ class PasswordResetRequest(BaseModel):
 
 class PasswordResetOTPVerification(BaseModel):
     email: EmailStr
-    otp: str
+    otp: str = Field(max_length=32)
 
 class ResetPassword(BaseModel):
     email: EmailStr
-    new_password: str
+    new_password: str = Field(max_length=1024)
 
 # Response Models
 class PasswordResetResponse(BaseModel):
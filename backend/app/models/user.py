@@ -1,25 +1,25 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from typing import Optional
 from datetime import datetime
 
 # Request Models
 class UserRegister(BaseModel):
     email: EmailStr
-    password: str
+    password: str = Field(max_length=1024)
     firstName: str
     lastName: str
 
 class UserLogin(BaseModel):
     email: EmailStr
-    password: str
+    password: str = Field(max_length=1024)
 
 class ProfileUpdate(BaseModel):
     firstName: str
     lastName: str
 
 class PasswordChange(BaseModel):
-    currentPassword: str
-    newPassword: str
+    currentPassword: str = Field(max_length=1024)
+    newPassword: str = Field(max_length=1024)
 
 # Response Models
 class UserResponse(BaseModel):
@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
 from typing import List
 from app.models.tutor_chat import (
     TutorEvaluationRequest, 
@@ -8,7 +9,7 @@ from app.models.tutor_chat import (
     ChatListItem
 )
 from app.middleware.auth_middleware import get_current_user
-from app.services.tutor_service import evaluate_response, continue_chat, get_chat_history, list_user_chats
+from app.services.tutor_service import evaluate_response, continue_chat, stream_chat, get_chat_history, list_user_chats
 
 router = APIRouter(prefix="/api/tutor", tags=["Tutor"])
 
@@ -49,6 +50,27 @@ async def continue_chat_endpoint(
             detail=str(e)
         )
 
+@router.post("/chat/{chat_id}/stream")
+async def stream_chat_endpoint(
+    chat_id: str,
+    request: ChatContinueRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """Continue a chat conversation, streaming the tutor's reply as plain text"""
+    try:
+        reply_chunks = await stream_chat(
+            current_user["user_id"],
+            chat_id,
+            request.message
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+    
+    return StreamingResponse(reply_chunks, media_type="text/plain; charset=utf-8")
+
 @router.get("/chat/{chat_id}", response_model=TutorChatResponse)
 async def get_chat_endpoint(
     chat_id: str,
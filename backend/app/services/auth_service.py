@@ -4,8 +4,8 @@ from bson import ObjectId
 from fastapi import HTTPException, status, Response
 from app.database import get_users_collection, get_refresh_tokens_collection
 from app.models.user import UserRegister, UserLogin, ProfileUpdate, PasswordChange
-from app.utils.password_handler import hash_password, verify_password, hash_token
-from app.utils.jwt_handler import create_access_token, create_refresh_token, verify_refresh_token
+from app.utils.password_handler import hash_password_async, verify_password_async, password_needs_rehash, hash_token, token_hash_candidates
+from app.utils.jwt_handler import create_access_token, create_refresh_token, verify_refresh_token, invalidate_refresh_token
 from app.settings.get_env import REFRESH_TOKEN_EXPIRE_DAYS, APP_ENV
 from app.services.email_service import send_verification_email, send_password_reset_email, send_email_change_otp
 from app.services.otp_service import create_otp, verify_otp
@@ -45,7 +45,7 @@ async def register_user(user_data: UserRegister) -> dict:
     # Create user document
     user_doc = {
         "email": user_data.email,
-        "passwordHash": hash_password(user_data.password),
+        "passwordHash": await hash_password_async(user_data.password),
         "firstName": user_data.firstName,
         "lastName": user_data.lastName,
         "isAdmin": False,
@@ -89,14 +89,11 @@ async def login_user(user_data: UserLogin, response: Response) -> dict:
     
     # Find user by email
     user = await users_collection.find_one({"email": user_data.email})
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid email or password"
-        )
     
-    # Verify password
-    if not verify_password(user_data.password, user["passwordHash"]):
+    # Verify password (unknown emails are checked against a dummy hash so they aren't
+    # distinguishable by response time)
+    password_hash = user["passwordHash"] if user else None
+    if not await verify_password_async(user_data.password, password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
@@ -116,10 +113,15 @@ async def login_user(user_data: UserLogin, response: Response) -> dict:
             detail="Email not verified. Please verify your email to login."
         )
     
-    # Update last login
+    # Update last login, upgrading a legacy (bcrypt) or outdated password hash while the
+    # plain password is at hand
+    login_update = {"lastLoginAt": datetime.utcnow()}
+    if password_needs_rehash(user["passwordHash"]):
+        login_update["passwordHash"] = await hash_password_async(user_data.password)
+    
     await users_collection.update_one(
         {"_id": user["_id"]},
-        {"$set": {"lastLoginAt": datetime.utcnow()}}
+        {"$set": login_update}
     )
     
     # Create tokens
@@ -186,11 +188,10 @@ async def refresh_access_token(refresh_token: str, response: Response) -> dict:
     
     # Check if refresh token exists in database
     refresh_tokens_collection = get_refresh_tokens_collection()
-    token_hash = hash_token(refresh_token)
     
     token_doc = await refresh_tokens_collection.find_one({
         "userId": ObjectId(user_id),
-        "tokenHash": token_hash,
+        "tokenHash": {"$in": token_hash_candidates(refresh_token)},
         "revoked": False
     })
     
@@ -242,11 +243,15 @@ async def logout_user(refresh_token: str, response: Response) -> dict:
     
     # Hash token and find it in database
     refresh_tokens_collection = get_refresh_tokens_collection()
-    token_hash = hash_token(refresh_token)
+    invalidate_refresh_token(refresh_token)
     
-    # Revoke token
+    # Revoke token (an oversized cookie can't match a stored token, so there is nothing to revoke)
+    try:
+        token_hashes = token_hash_candidates(refresh_token)
+    except ValueError:
+        token_hashes = []
     result = await refresh_tokens_collection.update_one(
-        {"tokenHash": token_hash, "revoked": False},
+        {"tokenHash": {"$in": token_hashes}, "revoked": False},
         {"$set": {"revoked": True}}
     )
     
@@ -310,7 +315,7 @@ async def change_password(user_id: str, password_data: PasswordChange) -> dict:
         )
     
     # Verify current password
-    if not verify_password(password_data.currentPassword, user["passwordHash"]):
+    if not await verify_password_async(password_data.currentPassword, user["passwordHash"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Current password is incorrect"
@@ -319,7 +324,7 @@ async def change_password(user_id: str, password_data: PasswordChange) -> dict:
     # Update password
     await users_collection.update_one(
         {"_id": ObjectId(user_id)},
-        {"$set": {"passwordHash": hash_password(password_data.newPassword)}}
+        {"$set": {"passwordHash": await hash_password_async(password_data.newPassword)}}
     )
     
     return {"message": "Password changed successfully"}
@@ -527,7 +532,7 @@ async def reset_password(email: str, new_password: str) -> dict:
     # Update password
     await users_collection.update_one(
         {"_id": user["_id"]},
-        {"$set": {"passwordHash": hash_password(new_password)}}
+        {"$set": {"passwordHash": await hash_password_async(new_password)}}
     )
     
     # Delete eligibility after password reset
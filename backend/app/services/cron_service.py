@@ -1,5 +1,6 @@
 from datetime import datetime, date, timezone
 from bson import ObjectId
+import asyncio
 import random
 import logging
 from app.database import (
@@ -12,12 +13,16 @@ from app.database import (
 from app.models.daily_task import TaskType, TaskStatus, TaskResult
 from app.models.tutor_chat import ChatStatus
 from app.services.openai_service import generate_mcq_question
+from app.settings.get_env import DAILY_TASK_CONCURRENCY
 from typing import List
 
 logger = logging.getLogger(__name__)
 
-async def generate_daily_tasks():
-    """Generate daily tasks for all active users"""
+async def generate_daily_tasks(concurrency: int = DAILY_TASK_CONCURRENCY):
+    """Generate daily tasks for all active users, processing up to `concurrency` users at once"""
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    
     users_collection = get_users_collection()
     cron_runs_collection = get_cron_runs_collection()
     
@@ -31,23 +36,30 @@ async def generate_daily_tasks():
     
     try:
         # Get all active users
-        active_users = await users_collection.find({"isRevoked": False}).to_list(length=None)
+        active_users = await users_collection.find(
+            {"isRevoked": False},
+            projection={"email": 1}
+        ).to_list(length=None)
         
-        for user in active_users:
-            try:
-                user_id = str(user["_id"])
-                today = date.today().isoformat()
-                
-                # Generate tasks for this user
-                result = await generate_daily_tasks_for_user(user_id, today)
-                
-                stats["usersProcessed"] += 1
-                stats["tasksCreated"] += result.get("tasksCreated", 0)
-                
-            except Exception as e:
-                error_msg = f"Error processing user {user.get('email', 'unknown')}: {str(e)}"
-                logger.error(error_msg)
-                stats["errors"].append(error_msg)
+        today = date.today().isoformat()
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def process_user(user: dict) -> None:
+            async with semaphore:
+                try:
+                    # Generate tasks for this user
+                    result = await generate_daily_tasks_for_user(str(user["_id"]), today)
+                    
+                    stats["usersProcessed"] += 1
+                    stats["tasksCreated"] += result.get("tasksCreated", 0)
+                    
+                except Exception as e:
+                    error_msg = f"Error processing user {user.get('email', 'unknown')}: {str(e)}"
+                    logger.error(error_msg)
+                    stats["errors"].append(error_msg)
+        
+        # Users are independent and mostly waiting on MongoDB/OpenAI, so overlap them
+        await asyncio.gather(*(process_user(user) for user in active_users))
         
         # Log successful run
         await cron_runs_collection.insert_one({
@@ -82,7 +94,7 @@ async def generate_daily_tasks_for_user(user_id: str, task_date: str) -> dict:
     existing = await daily_tasks_collection.find_one({
         "userId": ObjectId(user_id),
         "date": task_date
-    })
+    }, projection={"_id": 1})
     
     if existing:
         logger.info(f"Tasks already exist for user {user_id} on {task_date}")
@@ -96,10 +108,11 @@ async def generate_daily_tasks_for_user(user_id: str, task_date: str) -> dict:
         4: []
     }
     
+    # Only the fields used for selection and MCQ generation
     active_words = await words_collection.find({
         "userId": ObjectId(user_id),
         "state": "ACTIVE"
-    }).to_list(length=None)
+    }, projection={"word": 1, "meaning": 1, "example": 1, "priority": 1}).to_list(length=None)
     
     for word in active_words:
         priority = word.get("priority", 1)
@@ -136,7 +149,7 @@ async def generate_daily_tasks_for_user(user_id: str, task_date: str) -> dict:
         # Get current priorities for non-selected words
         non_selected_words = await words_collection.find({
             "_id": {"$in": non_selected_word_ids}
-        }).to_list(length=None)
+        }, projection={"priority": 1}).to_list(length=None)
         
         # Update each non-selected word's priority
         for word in non_selected_words:
@@ -161,6 +174,7 @@ async def generate_daily_tasks_for_user(user_id: str, task_date: str) -> dict:
             "wordId": word_id,
             "taskType": task_type.value,
             "messages": [],
+            "failureCount": 0,
             "finalResult": ChatStatus.PENDING.value,  # Start as PENDING until task is completed
             "createdAt": datetime.now(timezone.utc)
         }
@@ -9,6 +9,8 @@ from app.utils.password_handler import hash_otp, verify_otp as verify_otp_hash
 logger = logging.getLogger(__name__)
 
 OTP_EXPIRATION_MINUTES = 15
+# Wrong codes allowed per OTP before it is invalidated
+OTP_MAX_ATTEMPTS = 5
 ELIGIBILITY_EXPIRATION_MINUTES = 30
 
 def generate_otp() -> str:
@@ -65,7 +67,10 @@ async def verify_email_change_otp(user_id: ObjectId, otp: str) -> bool:
     otps_collection = get_email_change_otps_collection()
     
     # Find all OTP documents for this user with type "current_email"
-    cursor = otps_collection.find({"user_id": user_id, "otp_type": "current_email"})
+    cursor = otps_collection.find(
+        {"user_id": user_id, "otp_type": "current_email"},
+        projection={"otp": 1, "expires_at": 1}
+    )
     otp_docs = await cursor.to_list(length=None)
     
     if not otp_docs:
@@ -80,6 +85,16 @@ async def verify_email_change_otp(user_id: ObjectId, otp: str) -> bool:
             await otps_collection.delete_one({"_id": otp_doc["_id"]})
             continue
         
+        # Count the attempt before checking it, so parallel guesses can't exceed the limit
+        claimed = await otps_collection.update_one(
+            {"_id": otp_doc["_id"], "attempts": {"$not": {"$gte": OTP_MAX_ATTEMPTS}}},
+            {"$inc": {"attempts": 1}}
+        )
+        if claimed.modified_count == 0:
+            # Too many wrong codes were tried against this OTP
+            await otps_collection.delete_one({"_id": otp_doc["_id"]})
+            continue
+        
         # Verify the provided OTP against the stored hash
         if verify_otp_hash(otp, otp_doc["otp"]):
             # Delete OTP after successful verification
@@ -103,9 +118,6 @@ async def create_new_email_otp(user_id: ObjectId, new_email: str) -> str:
     """
     otps_collection = get_email_change_otps_collection()
     
-    # Delete any existing new email OTPs for this user
-    await otps_collection.delete_many({"user_id": user_id, "otp_type": "new_email"})
-    
     # Generate new OTP
     otp_code = generate_otp()
     expires_at = datetime.utcnow() + timedelta(minutes=OTP_EXPIRATION_MINUTES)
@@ -123,7 +135,12 @@ async def create_new_email_otp(user_id: ObjectId, new_email: str) -> str:
         "expires_at": expires_at
     }
     
-    await otps_collection.insert_one(otp_doc)
+    # Replace any existing new email OTP for this user in a single round trip
+    await otps_collection.replace_one(
+        {"user_id": user_id, "otp_type": "new_email"},
+        otp_doc,
+        upsert=True
+    )
     logger.info(f"New email OTP created for user {user_id} to {new_email}")
     
     return otp_code
@@ -147,7 +164,7 @@ async def verify_new_email_otp(user_id: ObjectId, new_email: str, otp: str) -> b
         "user_id": user_id,
         "otp_type": "new_email",
         "new_email": new_email
-    })
+    }, projection={"otp": 1, "expires_at": 1})
     otp_docs = await cursor.to_list(length=None)
     
     if not otp_docs:
@@ -162,6 +179,16 @@ async def verify_new_email_otp(user_id: ObjectId, new_email: str, otp: str) -> b
             await otps_collection.delete_one({"_id": otp_doc["_id"]})
             continue
         
+        # Count the attempt before checking it, so parallel guesses can't exceed the limit
+        claimed = await otps_collection.update_one(
+            {"_id": otp_doc["_id"], "attempts": {"$not": {"$gte": OTP_MAX_ATTEMPTS}}},
+            {"$inc": {"attempts": 1}}
+        )
+        if claimed.modified_count == 0:
+            # Too many wrong codes were tried against this OTP
+            await otps_collection.delete_one({"_id": otp_doc["_id"]})
+            continue
+        
         # Verify the provided OTP against the stored hash
         if verify_otp_hash(otp, otp_doc["otp"]):
             # Delete OTP after successful verification
@@ -193,9 +220,6 @@ async def create_eligibility_entry(user_id: ObjectId) -> None:
     """
     eligibility_collection = get_email_change_eligibility_collection()
     
-    # Delete any existing eligibility entries for this user
-    await eligibility_collection.delete_many({"user_id": user_id})
-    
     # Create eligibility document
     expires_at = datetime.utcnow() + timedelta(minutes=ELIGIBILITY_EXPIRATION_MINUTES)
     eligibility_doc = {
@@ -204,7 +228,8 @@ async def create_eligibility_entry(user_id: ObjectId) -> None:
         "expires_at": expires_at
     }
     
-    await eligibility_collection.insert_one(eligibility_doc)
+    # Replace any existing eligibility entry for this user in a single round trip
+    await eligibility_collection.replace_one({"user_id": user_id}, eligibility_doc, upsert=True)
     logger.info(f"Email change eligibility created for user {user_id}")
 
 async def check_eligibility(user_id: ObjectId) -> dict:
@@ -1,11 +1,12 @@
-from openai import OpenAI
+from openai import AsyncOpenAI
 from app.settings.get_env import OPENAI_API_KEY, OPENAI_MODEL
 import json
 import logging
 
 logger = logging.getLogger(__name__)
 
-client = OpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
+# Shared async client so every service reuses one HTTP connection pool
+client = AsyncOpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
 
 async def generate_mcq_question(word: dict) -> dict:
     """
@@ -61,7 +62,7 @@ Important:
 """
 
     try:
-        response = client.chat.completions.create(
+        response = await client.chat.completions.create(
             model=OPENAI_MODEL,
             messages=[
                 {
@@ -9,6 +9,8 @@ from app.utils.password_handler import hash_otp, verify_otp as verify_otp_hash
 logger = logging.getLogger(__name__)
 
 OTP_EXPIRATION_MINUTES = 15
+# Wrong codes allowed per OTP before it is invalidated
+OTP_MAX_ATTEMPTS = 5
 
 def generate_otp() -> str:
     """Generate a random 6-digit OTP"""
@@ -26,9 +28,6 @@ async def create_otp(user_id: ObjectId) -> str:
     """
     otps_collection = get_otps_collection()
     
-    # Delete any existing OTPs for this user
-    await delete_user_otps(user_id)
-    
     # Generate new OTP
     otp_code = generate_otp()
     expires_at = datetime.utcnow() + timedelta(minutes=OTP_EXPIRATION_MINUTES)
@@ -44,7 +43,8 @@ async def create_otp(user_id: ObjectId) -> str:
         "expires_at": expires_at
     }
     
-    await otps_collection.insert_one(otp_doc)
+    # Replace any existing OTP for this user in a single round trip
+    await otps_collection.replace_one({"user_id": user_id}, otp_doc, upsert=True)
     logger.info(f"OTP created for user {user_id}")
     
     return otp_code
@@ -63,7 +63,7 @@ async def verify_otp(user_id: ObjectId, otp: str) -> bool:
     otps_collection = get_otps_collection()
     
     # Find all OTP documents for this user (can't query by hash)
-    cursor = otps_collection.find({"user_id": user_id})
+    cursor = otps_collection.find({"user_id": user_id}, projection={"otp": 1, "expires_at": 1})
     otp_docs = await cursor.to_list(length=None)
     
     if not otp_docs:
@@ -78,6 +78,16 @@ async def verify_otp(user_id: ObjectId, otp: str) -> bool:
             await otps_collection.delete_one({"_id": otp_doc["_id"]})
             continue
         
+        # Count the attempt before checking it, so parallel guesses can't exceed the limit
+        claimed = await otps_collection.update_one(
+            {"_id": otp_doc["_id"], "attempts": {"$not": {"$gte": OTP_MAX_ATTEMPTS}}},
+            {"$inc": {"attempts": 1}}
+        )
+        if claimed.modified_count == 0:
+            # Too many wrong codes were tried against this OTP
+            await otps_collection.delete_one({"_id": otp_doc["_id"]})
+            continue
+        
         # Verify the provided OTP against the stored hash
         if verify_otp_hash(otp, otp_doc["otp"]):
             # Delete OTP after successful verification
@@ -9,6 +9,8 @@ from app.utils.password_handler import hash_otp, verify_otp as verify_otp_hash
 logger = logging.getLogger(__name__)
 
 OTP_EXPIRATION_MINUTES = 15
+# Wrong codes allowed per OTP before it is invalidated
+OTP_MAX_ATTEMPTS = 5
 ELIGIBILITY_EXPIRATION_MINUTES = 15
 
 def generate_otp() -> str:
@@ -27,9 +29,6 @@ async def create_password_reset_otp(user_id: ObjectId) -> str:
     """
     otps_collection = get_password_reset_otps_collection()
     
-    # Delete any existing password reset OTPs for this user
-    await delete_user_password_reset_otps(user_id)
-    
     # Generate new OTP
     otp_code = generate_otp()
     expires_at = datetime.utcnow() + timedelta(minutes=OTP_EXPIRATION_MINUTES)
@@ -45,7 +44,8 @@ async def create_password_reset_otp(user_id: ObjectId) -> str:
         "expires_at": expires_at
     }
     
-    await otps_collection.insert_one(otp_doc)
+    # Replace any existing password reset OTP for this user in a single round trip
+    await otps_collection.replace_one({"user_id": user_id}, otp_doc, upsert=True)
     logger.info(f"Password reset OTP created for user {user_id}")
     
     return otp_code
@@ -64,7 +64,7 @@ async def verify_password_reset_otp(user_id: ObjectId, otp: str) -> bool:
     otps_collection = get_password_reset_otps_collection()
     
     # Find all OTP documents for this user (can't query by hash)
-    cursor = otps_collection.find({"user_id": user_id})
+    cursor = otps_collection.find({"user_id": user_id}, projection={"otp": 1, "expires_at": 1})
     otp_docs = await cursor.to_list(length=None)
     
     if not otp_docs:
@@ -79,6 +79,16 @@ async def verify_password_reset_otp(user_id: ObjectId, otp: str) -> bool:
             await otps_collection.delete_one({"_id": otp_doc["_id"]})
             continue
         
+        # Count the attempt before checking it, so parallel guesses can't exceed the limit
+        claimed = await otps_collection.update_one(
+            {"_id": otp_doc["_id"], "attempts": {"$not": {"$gte": OTP_MAX_ATTEMPTS}}},
+            {"$inc": {"attempts": 1}}
+        )
+        if claimed.modified_count == 0:
+            # Too many wrong codes were tried against this OTP
+            await otps_collection.delete_one({"_id": otp_doc["_id"]})
+            continue
+        
         # Verify the provided OTP against the stored hash
         if verify_otp_hash(otp, otp_doc["otp"]):
             # Delete OTP after successful verification
@@ -111,9 +121,6 @@ async def create_eligibility_entry(user_id: ObjectId, email: str) -> None:
     """
     eligibility_collection = get_password_reset_eligibility_collection()
     
-    # Delete any existing eligibility entries for this user
-    await eligibility_collection.delete_many({"user_id": user_id})
-    
     # Create eligibility document
     expires_at = datetime.utcnow() + timedelta(minutes=ELIGIBILITY_EXPIRATION_MINUTES)
     eligibility_doc = {
@@ -124,7 +131,8 @@ async def create_eligibility_entry(user_id: ObjectId, email: str) -> None:
         "expires_at": expires_at
     }
     
-    await eligibility_collection.insert_one(eligibility_doc)
+    # Replace any existing eligibility entry for this user in a single round trip
+    await eligibility_collection.replace_one({"user_id": user_id}, eligibility_doc, upsert=True)
     logger.info(f"Password reset eligibility created for user {user_id}")
 
 async def check_eligibility(email: str) -> dict:
@@ -1,12 +1,16 @@
 from datetime import datetime, date
 from bson import ObjectId
 from fastapi import HTTPException, status
+from pymongo import ReturnDocument
 from app.database import get_daily_tasks_collection, get_words_collection, get_tutor_chats_collection
 from app.models.daily_task import DailyTaskResponse, TaskItem, TaskStatus, TaskResult
 from app.models.tutor_chat import ChatStatus
 from typing import List, Optional
 from app.services.cron_service import generate_daily_tasks_for_user
 
+# Fields read by _task_doc_to_response
+_DAILY_TASK_PROJECTION = {"userId": 1, "date": 1, "tasks": 1, "createdAt": 1}
+
 async def get_today_tasks(user_id: str) -> dict:
     """Get today's tasks for a user, creating them if they don't exist"""
     daily_tasks_collection = get_daily_tasks_collection()
@@ -16,7 +20,7 @@ async def get_today_tasks(user_id: str) -> dict:
     daily_task = await daily_tasks_collection.find_one({
         "userId": ObjectId(user_id),
         "date": today
-    })
+    }, projection=_DAILY_TASK_PROJECTION)
     
     # If tasks don't exist, generate them (this should normally be done by cron)
     if not daily_task:
@@ -26,7 +30,7 @@ async def get_today_tasks(user_id: str) -> dict:
         daily_task = await daily_tasks_collection.find_one({
             "userId": ObjectId(user_id),
             "date": today
-        })
+        }, projection=_DAILY_TASK_PROJECTION)
     
     if not daily_task:
         # Still no tasks - user might not have any words
@@ -51,91 +55,95 @@ async def complete_task(
     tutor_chats_collection = get_tutor_chats_collection()
     today = date.today().isoformat()
     
-    # Find the daily task document
-    daily_task = await daily_tasks_collection.find_one({
-        "userId": ObjectId(user_id),
-        "date": today
-    })
+    # Mark the task as completed and fetch the updated document in a single atomic round trip
+    daily_task = await daily_tasks_collection.find_one_and_update(
+        {
+            "userId": ObjectId(user_id),
+            "date": today,
+            "tasks.taskId": task_id
+        },
+        {
+            "$set": {
+                "tasks.$[t].status": TaskStatus.COMPLETED.value,
+                "tasks.$[t].result": result.value
+            }
+        },
+        array_filters=[{"t.taskId": task_id}],
+        projection=_DAILY_TASK_PROJECTION,
+        return_document=ReturnDocument.AFTER
+    )
     
     if not daily_task:
+        # Distinguish a missing daily task document from a missing task
+        exists = await daily_tasks_collection.find_one(
+            {"userId": ObjectId(user_id), "date": today},
+            projection={"_id": 1}
+        )
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Daily tasks not found for today"
+            detail="Task not found" if exists else "Daily tasks not found for today"
         )
     
-    # Find the specific task
-    task_found = False
-    chat_id_to_update = None
-    for task in daily_task.get("tasks", []):
-        if task["taskId"] == task_id:
-            task_found = True
-            # Update task status
-            task["status"] = TaskStatus.COMPLETED.value
-            task["result"] = result.value
-            
-            # Get chatId to update chat status
-            chat_id_to_update = task.get("chatId")
-            
-            # Update word statistics and priority
-            word_ids = task.get("wordIds", [])
-            task_type = task.get("type")
+    task = next(t for t in daily_task.get("tasks", []) if t["taskId"] == task_id)
+    
+    # Get chatId to update chat status
+    chat_id_to_update = task.get("chatId")
+    
+    # Update word statistics and priority
+    word_ids = task.get("wordIds", [])
+    task_type = task.get("type")
+    
+    for word_id_str in word_ids:
+        word_id = ObjectId(word_id_str)
+        word = await words_collection.find_one(
+            {"_id": word_id},
+            projection={"priority": 1, "masteryCount": 1}
+        )
+        
+        if word:
+            update_doc = {
+                "lastReviewedAt": datetime.utcnow(),
+                "updatedAt": datetime.utcnow()
+            }
             
-            for word_id_str in word_ids:
-                word_id = ObjectId(word_id_str)
-                word = await words_collection.find_one({"_id": word_id})
-                
-                if word:
-                    update_doc = {
-                        "lastReviewedAt": datetime.utcnow(),
-                        "updatedAt": datetime.utcnow()
+            if result == TaskResult.FAIL:
+                # FAIL: Set priority to 2 and increment failure stats
+                failure_field = f"failureStats.{task_type.lower()}"
+                await words_collection.update_one(
+                    {"_id": word_id},
+                    {
+                        "$set": {
+                            **update_doc,
+                            "priority": 2
+                        },
+                        "$inc": {failure_field: 1}
                     }
+                )
+            else:
+                # PASS: Set priority to 1
+                update_doc["priority"] = 1
+                
+                # For P4 words, also increment mastery count
+                if word.get("priority") == 4:
+                    new_mastery_count = word.get("masteryCount", 0) + 1
+                    update_doc["masteryCount"] = new_mastery_count
                     
-                    if result == TaskResult.FAIL:
-                        # FAIL: Set priority to 2 and increment failure stats
-                        failure_field = f"failureStats.{task_type.lower()}"
+                    await words_collection.update_one(
+                        {"_id": word_id},
+                        {"$set": update_doc}
+                    )
+                    
+                    # Check if word should be marked as mastered
+                    if new_mastery_count >= 3:
                         await words_collection.update_one(
                             {"_id": word_id},
-                            {
-                                "$set": {
-                                    **update_doc,
-                                    "priority": 2
-                                },
-                                "$inc": {failure_field: 1}
-                            }
+                            {"$set": {"state": "MASTERED"}}
                         )
-                    else:
-                        # PASS: Set priority to 1
-                        update_doc["priority"] = 1
-                        
-                        # For P4 words, also increment mastery count
-                        if word.get("priority") == 4:
-                            new_mastery_count = word.get("masteryCount", 0) + 1
-                            update_doc["masteryCount"] = new_mastery_count
-                            
-                            await words_collection.update_one(
-                                {"_id": word_id},
-                                {"$set": update_doc}
-                            )
-                            
-                            # Check if word should be marked as mastered
-                            if new_mastery_count >= 3:
-                                await words_collection.update_one(
-                                    {"_id": word_id},
-                                    {"$set": {"state": "MASTERED"}}
-                                )
-                        else:
-                            await words_collection.update_one(
-                                {"_id": word_id},
-                                {"$set": update_doc}
-                            )
-            
-            break
-    
-    if not task_found:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Task not found"
-        )
+                else:
+                    await words_collection.update_one(
+                        {"_id": word_id},
+                        {"$set": update_doc}
+                    )
     
     # Update chat status from PENDING to PASS/FAIL when task is completed
     if chat_id_to_update:
@@ -152,15 +160,7 @@ async def complete_task(
             logger = logging.getLogger(__name__)
             logger.error(f"Failed to update chat status: {e}")
     
-    # Update the daily task document
-    await daily_tasks_collection.update_one(
-        {"_id": daily_task["_id"]},
-        {"$set": {"tasks": daily_task["tasks"]}}
-    )
-    
-    # Fetch updated document
-    updated_task = await daily_tasks_collection.find_one({"_id": daily_task["_id"]})
-    return _task_doc_to_response(updated_task)
+    return _task_doc_to_response(daily_task)
 
 async def get_task_history(
     user_id: str,
@@ -171,7 +171,7 @@ async def get_task_history(
     
     tasks = await daily_tasks_collection.find({
         "userId": ObjectId(user_id)
-    }).sort("date", -1).limit(limit).to_list(length=limit)
+    }, projection=_DAILY_TASK_PROJECTION).sort("date", -1).limit(limit).to_list(length=limit)
     
     return [_task_doc_to_response(task) for task in tasks]
 
@@ -188,7 +188,7 @@ def _task_doc_to_response(task_doc: dict) -> dict:
                 "wordIds": task["wordIds"],
                 "status": task["status"],
                 "result": task.get("result"),
-                "chatId": str(task.get("chatId")) if task.get("chatId") else None,  # Convert ObjectId to string
+                "chatId": str(chat_id) if (chat_id := task.get("chatId")) else None,  # Convert ObjectId to string
                 "question": task.get("question"),
                 "options": task.get("options"),
                 "correctOption": task.get("correctOption"),
@@ -1,17 +1,39 @@
+import asyncio
+from dataclasses import dataclass
 from datetime import datetime
 from bson import ObjectId
-from openai import OpenAI
-from typing import Optional, List
+from pymongo import WriteConcern
+from typing import Optional, List, AsyncIterator
 from app.database import get_tutor_chats_collection, get_words_collection
 from app.models.tutor_chat import TutorEvaluationRequest, TutorEvaluationResponse, ChatMessage, EvaluationResult, ChatStatus
 from app.models.daily_task import TaskType, TaskResult
-from app.settings.get_env import OPENAI_API_KEY, OPENAI_MODEL
+from app.settings.get_env import OPENAI_MODEL, TUTOR_BATCH_MAX_SIZE, TUTOR_BATCH_WINDOW_MS
+from app.services.openai_service import client
+from app.utils.ttl_cache import TTLCache
+import hashlib
 import json
 import logging
 
 logger = logging.getLogger(__name__)
 
-client = OpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
+EVALUATION_CACHE_TTL_SECONDS = 3600
+EVALUATION_CACHE_MAX_SIZE = 4096
+
+# Chat continuation resends every message not yet folded into the rolling summary stored
+# on the chat document. Messages older than the last CHAT_HISTORY_MAX_TURNS exchanges are
+# folded in once at least CHAT_SUMMARY_MIN_MESSAGES of them have accumulated, so a turn
+# resends at most CHAT_HISTORY_MAX_TURNS * 2 + CHAT_SUMMARY_MIN_MESSAGES - 1 messages
+CHAT_HISTORY_MAX_TURNS = 6
+CHAT_SUMMARY_MIN_MESSAGES = 6
+
+# Appending a tutor conversation turn is not acknowledged so the reply doesn't wait on the
+# write; evaluation turns also update failureCount, which drives hint/reveal escalation, so
+# they (and new chats, which need their _id) use the default write concern
+_UNACKNOWLEDGED = WriteConcern(w=0)
+
+# First-attempt evaluations keyed on the exact prompt inputs, so identical submissions
+# (same word details, task type and normalized response) skip the OpenAI call
+_evaluation_cache = TTLCache(maxsize=EVALUATION_CACHE_MAX_SIZE, ttl=EVALUATION_CACHE_TTL_SECONDS)
 
 async def evaluate_response(
     user_id: str,
@@ -30,11 +52,12 @@ async def evaluate_response(
         word_id_obj = ObjectId(request.wordId)
     except Exception:
         raise Exception(f"Invalid wordId format: {request.wordId}")
+    user_id_obj = ObjectId(user_id)
     
     word = await words_collection.find_one({
         "_id": word_id_obj,
-        "userId": ObjectId(user_id)
-    })
+        "userId": user_id_obj
+    }, projection={"word": 1, "meaning": 1, "example": 1})
     
     if not word:
         raise Exception("Word not found")
@@ -45,63 +68,45 @@ async def evaluate_response(
         try:
             # chat_id might be a string (from frontend) or already an ObjectId
             chat_id_obj = ObjectId(chat_id) if isinstance(chat_id, str) else chat_id
-            existing_chat = await tutor_chats_collection.find_one({
+            existing_chat = await _find_latest_chat(tutor_chats_collection, {
                 "_id": chat_id_obj,
-                "userId": ObjectId(user_id)
+                "userId": user_id_obj
             })
         except Exception:
             # If chat_id is not a valid ObjectId, try to find by wordId + taskType instead
             existing_chat = None
     
     if not existing_chat:
-        existing_chat = await tutor_chats_collection.find_one({
-            "userId": ObjectId(user_id),
-            "wordId": ObjectId(request.wordId),
+        existing_chat = await _find_latest_chat(tutor_chats_collection, {
+            "userId": user_id_obj,
+            "wordId": word_id_obj,
             "taskType": request.taskType.value
-        }, sort=[("createdAt", -1)])
-    
-    messages = []
-    failure_count = 0
-    
-    if existing_chat:
-        # Load existing conversation for context
-        messages = existing_chat.get("messages", [])
-        # Count failures in existing messages
-        for msg in messages:
-            if msg.get("role") == "assistant":
-                content = msg.get("content", "")
-                if "FAIL" in content or "incorrect" in content.lower() or "wrong" in content.lower():
-                    failure_count += 1
-    
-    # Add user response
-    messages.append({
+        })
+    
+    # Failures are tracked on the chat document (legacy chats are counted by MongoDB)
+    failure_count = existing_chat.get("failureCount", 0) if existing_chat else 0
+    
+    user_message = {
         "role": "user",
         "content": request.userResponse
-    })
+    }
     
     try:
-        # Always do evaluation (initial or re-evaluation)
-        system_prompt = _build_system_prompt(request.taskType, word)
-        evaluation_prompt = _build_evaluation_prompt(
-            word,
-            request.taskType,
-            request.userResponse,
-            failure_count
-        )
+        # Retries are never cached since they must escalate towards revealing the answer
+        cache_key = _evaluation_cache_key(request.taskType, word, request.userResponse) if failure_count == 0 else None
+        evaluation = _evaluation_cache.get(cache_key) if cache_key else None
         
-        # Call OpenAI for evaluation
-        response = client.chat.completions.create(
-            model=OPENAI_MODEL,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": evaluation_prompt}
-            ],
-            response_format={"type": "json_object"},
-            temperature=0.2  # Lower temperature for stricter evaluation
-        )
-        
-        content = response.choices[0].message.content
-        evaluation = json.loads(content)
+        if evaluation is None:
+            # Always do evaluation (initial or re-evaluation); concurrent evaluations share OpenAI calls
+            evaluation = await _evaluation_batcher.evaluate(
+                user_id,
+                request.taskType,
+                word,
+                request.userResponse,
+                failure_count
+            )
+            if cache_key:
+                _evaluation_cache.set(cache_key, evaluation)
         
         result = evaluation.get("result", "FAIL")
         feedback = evaluation.get("feedback", "")
@@ -119,39 +124,44 @@ async def evaluate_response(
         if reason:
             assistant_content += f"\n\nReason: {reason}"
         
-        assistant_message = {
-            "role": "assistant",
-            "content": assistant_content
-        }
-        messages.append(assistant_message)
-        
         # Determine final result - but don't update chat status yet (wait for task completion)
         # Chat status will be updated when task is completed in task_service
         final_result = TaskResult.PASS if result == "PASS" else TaskResult.FAIL
+        failure_increment = 1 if final_result == TaskResult.FAIL else 0
+        
+        assistant_message = {
+            "role": "assistant",
+            "content": assistant_content,
+            "result": final_result.value
+        }
         
         # Save or update chat (keep status as PENDING until task is completed)
         if existing_chat:
+            # Only append the new turn instead of rewriting the whole history
+            # Don't update finalResult here - it will be updated when task is completed
+            chat_update = {"$push": {"messages": {"$each": [user_message, assistant_message]}}}
+            if existing_chat.get("failureCountStored"):
+                chat_update["$inc"] = {"failureCount": failure_increment}
+            else:
+                # Legacy chat: persist the counted failures so later turns can skip the scan
+                chat_update["$set"] = {"failureCount": failure_count + failure_increment}
             await tutor_chats_collection.update_one(
                 {"_id": existing_chat["_id"]},
-                {
-                    "$set": {
-                        "messages": messages
-                        # Don't update finalResult here - it will be updated when task is completed
-                    }
-                }
+                chat_update
             )
             chat_id = str(existing_chat["_id"])
         else:
             chat_doc = {
-                "userId": ObjectId(user_id),
-                "wordId": ObjectId(request.wordId),
+                "userId": user_id_obj,
+                "wordId": word_id_obj,
                 "taskType": request.taskType.value,
-                "messages": messages,
+                "messages": [user_message, assistant_message],
+                "failureCount": failure_increment,
                 "finalResult": ChatStatus.PENDING.value,  # Start as PENDING
                 "createdAt": datetime.utcnow()
             }
-            result = await tutor_chats_collection.insert_one(chat_doc)
-            chat_id = str(result.inserted_id)
+            insert_result = await tutor_chats_collection.insert_one(chat_doc)
+            chat_id = str(insert_result.inserted_id)
         
         return {
             "result": EvaluationResult.PASS if result == "PASS" else EvaluationResult.FAIL,
@@ -167,71 +177,178 @@ async def evaluate_response(
         logger.error(f"Error evaluating response: {e}")
         raise Exception(f"Failed to evaluate response: {str(e)}")
 
-def _build_system_prompt(task_type: TaskType, word: dict) -> str:
-    """Build system prompt for AI tutor - strict evaluation"""
-    word_text = word.get('word', '')
-    meaning = word.get('meaning', '')
-    example = word.get('example', '')
-    
-    base_prompt = f"""You are a strict vocabulary tutor evaluating student responses. 
-You must be accurate and precise in your assessments.
+# Legacy chats created before failureCount was stored: an assistant message counts as a
+# failed attempt when it mentions "FAIL" (case-sensitive) or "incorrect"/"wrong" (any case)
+_FAILURE_PATTERN = "FAIL|(?i:incorrect|wrong)"
 
-Word: {word_text}
-Correct meaning: {meaning}
-Example: {example}
+_LEGACY_FAILURE_COUNT = {
+    "$size": {
+        "$filter": {
+            "input": {"$ifNull": ["$messages", []]},
+            "as": "m",
+            "cond": {
+                "$and": [
+                    {"$eq": ["$$m.role", "assistant"]},
+                    {
+                        "$regexMatch": {
+                            "input": {"$ifNull": ["$$m.content", ""]},
+                            "regex": _FAILURE_PATTERN
+                        }
+                    }
+                ]
+            }
+        }
+    }
+}
+
+# Constant $project stage returning the stored failure count (or the legacy count),
+# built once at import time
+_FAILURE_COUNT_STAGE = {
+    "$project": {
+        "failureCount": {"$ifNull": ["$failureCount", _LEGACY_FAILURE_COUNT]},
+        "failureCountStored": {"$ne": [{"$type": "$failureCount"}, "missing"]}
+    }
+}
+
+async def _find_latest_chat(tutor_chats_collection, match: dict) -> Optional[dict]:
+    """
+    Fetch the most recent chat matching the filter together with its failure count.
+    
+    Only _id, failureCount and whether failureCount is stored on the document are returned.
+    """
+    pipeline = [
+        {"$match": match},
+        {"$sort": {"createdAt": -1}},
+        {"$limit": 1},
+        _FAILURE_COUNT_STAGE
+    ]
+    chats = await tutor_chats_collection.aggregate(pipeline).to_list(length=1)
+    return chats[0] if chats else None
+
+def _evaluation_cache_key(task_type: TaskType, word: dict, user_response: str) -> str:
+    """Build the exact-match cache key for a first-attempt evaluation"""
+    fields = _prompt_fields(word)
+    material = "\0".join([
+        task_type.value,
+        str(fields["word"]),
+        str(fields["meaning"]),
+        str(fields["example"]),
+        user_response.strip().lower()
+    ])
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+def _prompt_fields(word: dict) -> dict:
+    """Extract the word fields interpolated into prompt templates"""
+    return {
+        "word": word.get('word', ''),
+        "meaning": word.get('meaning', ''),
+        "example": word.get('example', '')
+    }
+
+# System prompts contain only the task-type rubric and output schema, so they are
+# byte-identical across users and words and OpenAI's prompt cache can reuse them.
+# Word details and the student response always go into the user message.
+_BASE_SYSTEM_PROMPT = """You are a strict vocabulary tutor evaluating student responses. 
+You must be accurate and precise in your assessments.
+The word, its correct meaning, an example and the student's response are given in the user message.
 
 Evaluation rules:
 - Be STRICT in your judgment - only accept answers that demonstrate clear understanding
 - Accept accurate paraphrases and synonyms that convey the same meaning
 - Reject vague, circular, incorrect, or partially correct definitions
 - For sentence/paragraph tasks, ensure the word is used correctly in context
-- Be encouraging but maintain high standards"""
-    
-    if task_type == TaskType.MEANING:
-        return f"""{base_prompt}
+- Be encouraging but maintain high standards
 
-Task: The student must provide the meaning of "{word_text}".
-Correct meaning: {meaning}
+Evaluation criteria (BE STRICT):
+- For MEANING: Response must accurately convey the meaning. Accept synonyms/paraphrases only if they are accurate.
+- For SENTENCE: Sentence must use the word correctly in context. Grammar and coherence matter.
+- For PARAGRAPH: Paragraph must be at least 50 words, use the word correctly, and be meaningful.
+
+Return a JSON object with this EXACT structure:
+{
+    "result": "PASS" or "FAIL",
+    "feedback": "Detailed feedback explaining why PASS or FAIL. Be specific and constructive.",
+    "hint": "Optional hint if FAIL (only on first failure, provide guidance without revealing answer)",
+    "answerRevealed": true/false (true only on second failure),
+    "expectedAnswer": "The correct meaning of the word, as given in the word details",
+    "reason": "Clear explanation of why the answer is correct or incorrect. Be specific about what was right or wrong."
+}"""
+
+SYSTEM_PROMPT_MEANING = _BASE_SYSTEM_PROMPT + """
+
+Task: The student must provide the meaning of the word.
 
 Evaluate strictly. The student's response must accurately convey the meaning."""
-    
-    elif task_type == TaskType.SENTENCE:
-        return f"""{base_prompt}
 
-Task: The student must create a sentence using "{word_text}" correctly.
-Example sentence: {example}
-Word meaning: {meaning}
+SYSTEM_PROMPT_SENTENCE = _BASE_SYSTEM_PROMPT + """
+
+Task: The student must create a sentence using the word correctly.
 
 Evaluate strictly. The sentence must use the word correctly in context."""
-    
-    elif task_type == TaskType.PARAGRAPH:
-        return f"""{base_prompt}
 
-Task: The student must write a meaningful paragraph (at least 50 words) using "{word_text}".
-Word meaning: {meaning}
-Example: {example}
+SYSTEM_PROMPT_PARAGRAPH = _BASE_SYSTEM_PROMPT + """
+
+Task: The student must write a meaningful paragraph (at least 50 words) using the word.
 
 Evaluate strictly. The paragraph must:
 - Be at least 50 words
 - Use the word correctly in context
 - Be meaningful and coherent"""
-    
-    return base_prompt
 
-def _build_chat_prompt(task_type: TaskType, word: dict) -> str:
-    """Build system prompt for chat continuation"""
-    word_text = word.get('word', '')
-    meaning = word.get('meaning', '')
-    example = word.get('example', '')
-    
-    return f"""You are a helpful vocabulary tutor helping a student learn the word "{word_text}".
+_SYSTEM_PROMPTS = {
+    TaskType.MEANING: SYSTEM_PROMPT_MEANING,
+    TaskType.SENTENCE: SYSTEM_PROMPT_SENTENCE,
+    TaskType.PARAGRAPH: SYSTEM_PROMPT_PARAGRAPH
+}
+
+CHAT_SYSTEM_PROMPT = """You are a helpful vocabulary tutor helping a student learn a word. The word details are given in the next message.
+
+The student has already completed the initial evaluation. Now they can ask you questions about the word, its usage, examples, synonyms, or any related topics. Be helpful, encouraging, and educational. Provide clear explanations and examples when needed."""
+
+_CHAT_CONTEXT_TEMPLATE = """The student is learning the word "{word}".
 
 Word details:
-- Word: {word_text}
+- Word: {word}
 - Meaning: {meaning}
+- Example: {example}"""
+
+_EVALUATION_PROMPT_TEMPLATE = """Evaluate this student response STRICTLY for the word "{word}".
+
+Word details:
+- Word: {word}
+- Correct meaning: {meaning}
 - Example: {example}
+- Task type: {task_type}
+- Student response: {user_response}
 
-The student has already completed the initial evaluation. Now they can ask you questions about the word, its usage, examples, synonyms, or any related topics. Be helpful, encouraging, and educational. Provide clear explanations and examples when needed."""
+Failure count so far: {failure_count}
+"""
+
+_BATCH_EVALUATION_PROMPT_TEMPLATE = """Evaluate each of the following student responses STRICTLY and independently.
+Every item is a {task_type} task with its own word details, student response, failure count and attempt instructions.
+
+Items:
+{items}
+
+Return a JSON object of the form {{"results": [...]}} with exactly one entry per item.
+Each entry must contain the item's "id" plus every field of the JSON structure described in the system prompt.
+"""
+
+# System messages never change, so the message dicts themselves are built once at import
+_SYSTEM_MESSAGES = {
+    task_type: {"role": "system", "content": _SYSTEM_PROMPTS.get(task_type, _BASE_SYSTEM_PROMPT)}
+    for task_type in TaskType
+}
+
+_CHAT_SYSTEM_MESSAGE = {"role": "system", "content": CHAT_SYSTEM_PROMPT}
+
+def _build_system_message(task_type: TaskType) -> dict:
+    """Get the static system message for AI tutor evaluation - strict evaluation"""
+    return _SYSTEM_MESSAGES[task_type]
+
+def _build_chat_prompt(word: dict) -> str:
+    """Build the word context message that follows the static chat system prompt"""
+    return _CHAT_CONTEXT_TEMPLATE.format_map(_prompt_fields(word))
 
 def _build_evaluation_prompt(
     word: dict,
@@ -240,49 +357,301 @@ def _build_evaluation_prompt(
     failure_count: int
 ) -> str:
     """Build evaluation prompt for OpenAI - strict evaluation"""
-    word_text = word.get('word', '')
-    meaning = word.get('meaning', '')
-    example = word.get('example', '')
-    
-    prompt = f"""Evaluate this student response STRICTLY for the word "{word_text}".
+    prompt = _EVALUATION_PROMPT_TEMPLATE.format(
+        task_type=task_type.value,
+        user_response=user_response,
+        failure_count=failure_count,
+        **_prompt_fields(word)
+    )
+    
+    return prompt + _build_attempt_instructions(task_type, failure_count)
 
-Word details:
-- Word: {word_text}
-- Correct meaning: {meaning}
-- Example: {example}
-- Task type: {task_type.value}
-- Student response: {user_response}
+# Attempt instructions indexed by min(failure_count, 2); later attempts get no extra note
+_FAILURE_SUFFIXES = (
+    "\nThis is the first attempt. If FAIL, provide a helpful hint but don't reveal the answer.",
+    "\nThis is the second attempt. If FAIL, reveal the correct answer and provide detailed explanation.",
+    ""
+)
 
-Evaluation criteria (BE STRICT):
-- For MEANING: Response must accurately convey the meaning. Accept synonyms/paraphrases only if they are accurate.
-- For SENTENCE: Sentence must use the word correctly in context. Grammar and coherence matter.
-- For PARAGRAPH: Paragraph must be at least 50 words, use the word correctly, and be meaningful.
+_TASK_SUFFIXES = {
+    TaskType.PARAGRAPH: "\nIMPORTANT: Check that the paragraph is at least 50 words. If shorter, it should FAIL."
+}
 
-Return a JSON object with this EXACT structure:
-{{
-    "result": "PASS" or "FAIL",
-    "feedback": "Detailed feedback explaining why PASS or FAIL. Be specific and constructive.",
-    "hint": "Optional hint if FAIL (only on first failure, provide guidance without revealing answer)",
-    "answerRevealed": true/false (true only on second failure),
-    "expectedAnswer": "{meaning}",
-    "reason": "Clear explanation of why the answer is correct or incorrect. Be specific about what was right or wrong."
-}}
+def _build_attempt_instructions(task_type: TaskType, failure_count: int) -> str:
+    """Build the attempt-specific instructions appended to an evaluation prompt"""
+    return _FAILURE_SUFFIXES[min(failure_count, 2)] + _TASK_SUFFIXES.get(task_type, "")
 
-Failure count so far: {failure_count}
-"""
+async def _request_evaluation(
+    task_type: TaskType,
+    word: dict,
+    user_response: str,
+    failure_count: int
+) -> dict:
+    """Evaluate a single response with one OpenAI call"""
+    evaluation_prompt = _build_evaluation_prompt(word, task_type, user_response, failure_count)
+    
+    response = await client.chat.completions.create(
+        model=OPENAI_MODEL,
+        messages=[
+            _build_system_message(task_type),
+            {"role": "user", "content": evaluation_prompt}
+        ],
+        response_format={"type": "json_object"},
+        temperature=0.2  # Lower temperature for stricter evaluation
+    )
+    
+    return json.loads(response.choices[0].message.content)
+
+@dataclass
+class _EvaluationItem:
+    user_id: str
+    task_type: TaskType
+    word: dict
+    user_response: str
+    failure_count: int
+    future: asyncio.Future
+
+async def _request_batch_evaluation(task_type: TaskType, items: List[_EvaluationItem]) -> List[Optional[dict]]:
+    """Evaluate several responses of the same user and task type with one OpenAI call"""
+    payload = [
+        {
+            "id": index,
+            **_prompt_fields(item.word),
+            "studentResponse": item.user_response,
+            "failureCount": item.failure_count,
+            "instructions": _build_attempt_instructions(task_type, item.failure_count).strip()
+        }
+        for index, item in enumerate(items)
+    ]
+    prompt = _BATCH_EVALUATION_PROMPT_TEMPLATE.format(
+        task_type=task_type.value,
+        items=json.dumps(payload, ensure_ascii=False, indent=2)
+    )
+    
+    # Same static system message as single evaluations so the prompt cache still hits
+    response = await client.chat.completions.create(
+        model=OPENAI_MODEL,
+        messages=[
+            _build_system_message(task_type),
+            {"role": "user", "content": prompt}
+        ],
+        response_format={"type": "json_object"},
+        temperature=0.2
+    )
+    
+    results = json.loads(response.choices[0].message.content).get("results", [])
+    by_id = {entry.get("id"): entry for entry in results if isinstance(entry, dict)}
+    return [by_id.get(index) for index in range(len(items))]
+
+class _EvaluationBatcher:
+    """
+    Coalesces evaluations submitted within a short window into shared OpenAI calls.
+    
+    Items are only batched with others from the same user and task type, so one
+    student's free-text answer never shares a prompt with (and can't sway the
+    verdicts of) another student's. A background worker takes the oldest item and
+    dispatches queued items for other users or task types right away; only when
+    another item for the same user and task type is already queued does it wait,
+    at most window_seconds, to collect up to max_batch_size of them. Single-item
+    groups use the regular single evaluation prompt.
+    """
+    
+    def __init__(self, max_batch_size: int, window_seconds: float):
+        self.max_batch_size = max_batch_size
+        self.window_seconds = window_seconds
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._dispatches = set()
+    
+    async def evaluate(
+        self,
+        user_id: str,
+        task_type: TaskType,
+        word: dict,
+        user_response: str,
+        failure_count: int
+    ) -> dict:
+        """Submit a response for evaluation and wait for its result"""
+        if self.max_batch_size <= 1:
+            return await _request_evaluation(task_type, word, user_response, failure_count)
+        
+        loop = asyncio.get_running_loop()
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        if self._worker is None or self._worker.done():
+            self._worker = loop.create_task(self._run())
+        
+        future = loop.create_future()
+        await self._queue.put(_EvaluationItem(user_id, task_type, word, user_response, failure_count, future))
+        return await future
+    
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            first = await self._queue.get()
+            key = (first.user_id, first.task_type)
+            batch = [first]
+            
+            # Items already queued for other users or task types don't wait on this batch
+            others = {}
+            while len(batch) < self.max_batch_size and not self._queue.empty():
+                item = self._queue.get_nowait()
+                if (item.user_id, item.task_type) == key:
+                    batch.append(item)
+                else:
+                    others.setdefault((item.user_id, item.task_type), []).append(item)
+            for (_, task_type), items in others.items():
+                self._start_dispatch(task_type, items)
+            
+            # The window only applies when this user already has another evaluation queued
+            if len(batch) > 1:
+                deadline = loop.time() + self.window_seconds
+                while len(batch) < self.max_batch_size:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                    if (item.user_id, item.task_type) == key:
+                        batch.append(item)
+                    else:
+                        self._start_dispatch(item.task_type, [item])
+            
+            self._start_dispatch(first.task_type, batch)
+    
+    def _start_dispatch(self, task_type: TaskType, items: List[_EvaluationItem]) -> None:
+        """Run a dispatch in the background, keeping a reference until it finishes"""
+        dispatch = asyncio.get_running_loop().create_task(self._dispatch(task_type, items))
+        self._dispatches.add(dispatch)
+        dispatch.add_done_callback(self._dispatches.discard)
+    
+    async def _dispatch(self, task_type: TaskType, items: List[_EvaluationItem]) -> None:
+        try:
+            if len(items) == 1:
+                item = items[0]
+                evaluations = [
+                    await _request_evaluation(task_type, item.word, item.user_response, item.failure_count)
+                ]
+            else:
+                evaluations = await _request_batch_evaluation(task_type, items)
+                # Re-evaluate individually any item the batched response left out
+                missing = [item for item, evaluation in zip(items, evaluations) if evaluation is None]
+                if missing:
+                    logger.warning(f"Batched evaluation missed {len(missing)} of {len(items)} items, retrying individually")
+                    retried = iter(await asyncio.gather(*[
+                        _request_evaluation(task_type, item.word, item.user_response, item.failure_count)
+                        for item in missing
+                    ]))
+                    evaluations = [evaluation if evaluation is not None else next(retried) for evaluation in evaluations]
+        except Exception as e:
+            for item in items:
+                if not item.future.done():
+                    item.future.set_exception(e)
+            return
+        
+        for item, evaluation in zip(items, evaluations):
+            if not item.future.done():
+                item.future.set_result(evaluation)
+
+_evaluation_batcher = _EvaluationBatcher(TUTOR_BATCH_MAX_SIZE, TUTOR_BATCH_WINDOW_MS / 1000)
+
+# Projection for chat continuation: the full history is never loaded, only the
+# messages after summarizedCount plus the total message count
+_CHAT_CONTINUATION_STAGE = {
+    "$project": {
+        "wordId": 1,
+        "finalResult": 1,
+        "summary": 1,
+        "summarizedCount": 1,
+        "messageCount": {"$size": {"$ifNull": ["$messages", []]}},
+        "messages": {
+            "$slice": [
+                {"$ifNull": ["$messages", []]},
+                {"$ifNull": ["$summarizedCount", 0]},
+                2147483647
+            ]
+        }
+    }
+}
+
+@dataclass
+class _ChatTurn:
+    """A validated chat continuation: the prompt to send and what is needed to persist the turn"""
+    chat_id_obj: ObjectId
+    user_message: dict
+    chat_messages: List[dict]
+    messages: List[dict]
+    message_count: int
+    summary: Optional[str]
+    summarized_count: int
+
+async def continue_chat(user_id: str, chat_id: str, message: str) -> dict:
+    """Continue a chat conversation"""
+    turn = await _prepare_chat_turn(user_id, chat_id, message)
     
-    if failure_count == 0:
-        prompt += "\nThis is the first attempt. If FAIL, provide a helpful hint but don't reveal the answer."
-    elif failure_count == 1:
-        prompt += "\nThis is the second attempt. If FAIL, reveal the correct answer and provide detailed explanation."
+    try:
+        # Call OpenAI for chat continuation
+        response = await client.chat.completions.create(
+            model=OPENAI_MODEL,
+            messages=turn.chat_messages,
+            temperature=0.7
+        )
+        
+        assistant_content = response.choices[0].message.content
+        await _save_chat_turn(turn, assistant_content)
+        
+        return {
+            "result": EvaluationResult.PASS,
+            "feedback": assistant_content,
+            "hint": None,
+            "answerRevealed": False,
+            "chatId": chat_id,
+            "expectedAnswer": None,
+            "reason": None
+        }
+        
+    except Exception as e:
+        logger.error(f"Error continuing chat: {e}")
+        raise Exception(f"Failed to continue chat: {str(e)}")
+
+async def stream_chat(user_id: str, chat_id: str, message: str) -> AsyncIterator[str]:
+    """
+    Continue a chat conversation, streaming the tutor's reply as it is generated.
     
-    if task_type == TaskType.PARAGRAPH:
-        prompt += "\nIMPORTANT: Check that the paragraph is at least 50 words. If shorter, it should FAIL."
+    The chat is validated before this returns, so errors such as a missing or pending chat
+    are raised here rather than mid-stream. The turn is saved once the stream completes.
     
-    return prompt
+    Returns:
+        Async iterator of reply text chunks
+    """
+    turn = await _prepare_chat_turn(user_id, chat_id, message)
+    
+    async def reply_chunks() -> AsyncIterator[str]:
+        parts = []
+        try:
+            stream = await client.chat.completions.create(
+                model=OPENAI_MODEL,
+                messages=turn.chat_messages,
+                temperature=0.7,
+                stream=True
+            )
+            async for chunk in stream:
+                if chunk.choices and (content := chunk.choices[0].delta.content):
+                    parts.append(content)
+                    yield content
+        except Exception as e:
+            # Headers are already sent, so the client just sees the reply end early
+            logger.error(f"Error streaming chat {turn.chat_id_obj}: {e}")
+            return
+        
+        await _save_chat_turn(turn, "".join(parts))
+    
+    return reply_chunks()
 
-async def continue_chat(user_id: str, chat_id: str, message: str) -> dict:
-    """Continue a chat conversation"""
+async def _prepare_chat_turn(user_id: str, chat_id: str, message: str) -> _ChatTurn:
+    """Validate that the chat can be continued and build the prompt for the next turn"""
     if not client:
         raise Exception("OpenAI API key not configured")
     
@@ -295,14 +664,16 @@ async def continue_chat(user_id: str, chat_id: str, message: str) -> dict:
         chat_id_obj = ObjectId(chat_id) if isinstance(chat_id, str) else chat_id
     except Exception:
         raise Exception(f"Invalid chatId format: {chat_id}")
+    user_id_obj = ObjectId(user_id)
     
-    chat = await tutor_chats_collection.find_one({
-        "_id": chat_id_obj,
-        "userId": ObjectId(user_id)
-    })
+    chats = await tutor_chats_collection.aggregate([
+        {"$match": {"_id": chat_id_obj, "userId": user_id_obj}},
+        _CHAT_CONTINUATION_STAGE
+    ]).to_list(length=1)
     
-    if not chat:
+    if not chats:
         raise Exception("Chat not found")
+    chat = chats[0]
     
     # Don't allow continuing PENDING chats - task must be completed first
     if chat.get("finalResult") == ChatStatus.PENDING.value:
@@ -311,74 +682,112 @@ async def continue_chat(user_id: str, chat_id: str, message: str) -> dict:
     # Get word information
     word = await words_collection.find_one({
         "_id": chat["wordId"],
-        "userId": ObjectId(user_id)
-    })
+        "userId": user_id_obj
+    }, projection={"word": 1, "meaning": 1, "example": 1})
     
     if not word:
         raise Exception("Word not found")
     
-    # Get existing messages
+    # Only messages not yet folded into the summary are loaded; they start at summarizedCount
     messages = chat.get("messages", [])
-    task_type = TaskType(chat.get("taskType"))
+    summary = chat.get("summary")
     
-    # Add user message
-    messages.append({
+    user_message = {
         "role": "user",
         "content": message
-    })
-    
-    # Build chat prompt
-    system_prompt = _build_chat_prompt(task_type, word)
+    }
     
-    # Build messages for OpenAI
+    # Build chat prompt: static system prompt first so it stays cacheable, then word context
+    word_context = _build_chat_prompt(word)
     chat_messages = [
-        {"role": "system", "content": system_prompt}
-    ] + messages[:-1]  # All messages except the last user message
+        _CHAT_SYSTEM_MESSAGE,
+        {"role": "system", "content": word_context}
+    ]
+    if summary:
+        chat_messages.append({"role": "system", "content": f"Conversation summary so far: {summary}"})
+    
+    # Every message not covered by the summary is resent, followed by the current user message
+    # (stored messages may carry extra fields such as "result", so keep only role and content)
+    chat_messages += [{"role": msg["role"], "content": msg["content"]} for msg in messages]
+    chat_messages.append(user_message)
+    
+    return _ChatTurn(
+        chat_id_obj=chat_id_obj,
+        user_message=user_message,
+        chat_messages=chat_messages,
+        messages=messages,
+        message_count=chat.get("messageCount", 0),
+        summary=summary,
+        summarized_count=chat.get("summarizedCount", 0)
+    )
+
+async def _save_chat_turn(turn: _ChatTurn, assistant_content: str) -> None:
+    """Append the user message and tutor reply to the chat and refresh its summary if due"""
+    assistant_message = {
+        "role": "assistant",
+        "content": assistant_content
+    }
     
-    # Add the current user message
-    chat_messages.append({
-        "role": "user",
-        "content": message
-    })
+    await get_tutor_chats_collection().with_options(write_concern=_UNACKNOWLEDGED).update_one(
+        {"_id": turn.chat_id_obj},
+        {"$push": {"messages": {"$each": [turn.user_message, assistant_message]}}}
+    )
+    
+    # Fold messages that fell out of the window into the summary
+    window_start = turn.message_count + 2 - CHAT_HISTORY_MAX_TURNS * 2
+    if window_start - turn.summarized_count >= CHAT_SUMMARY_MIN_MESSAGES:
+        _run_in_background(_refresh_chat_summary(
+            turn.chat_id_obj,
+            turn.summary,
+            turn.messages[:window_start - turn.summarized_count],
+            window_start
+        ))
+
+_SUMMARY_PROMPT_TEMPLATE = """Summarize this vocabulary tutoring conversation so the tutor can continue it without the full transcript.
+Keep the student's questions, the key explanations and examples given, and any mistakes the student made. Be concise.
+
+Summary so far:
+{summary}
+
+Messages to add to the summary:
+{transcript}"""
+
+_background_tasks = set()
+
+def _run_in_background(coro) -> None:
+    """Schedule a coroutine without awaiting it, keeping a reference until it finishes"""
+    task = asyncio.get_running_loop().create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+async def _refresh_chat_summary(
+    chat_id_obj: ObjectId,
+    summary: Optional[str],
+    messages: List[dict],
+    summarized_count: int
+) -> None:
+    """Fold older chat messages into the chat's rolling summary"""
+    transcript = "\n".join(f"{msg['role']}: {msg['content']}" for msg in messages)
+    prompt = _SUMMARY_PROMPT_TEMPLATE.format(summary=summary or "(none)", transcript=transcript)
     
     try:
-        # Call OpenAI for chat continuation
-        response = client.chat.completions.create(
+        response = await client.chat.completions.create(
             model=OPENAI_MODEL,
-            messages=chat_messages,
-            temperature=0.7
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.2
         )
-        
-        assistant_content = response.choices[0].message.content
-        assistant_message = {
-            "role": "assistant",
-            "content": assistant_content
-        }
-        messages.append(assistant_message)
-        
-        # Update chat (use chat_id_obj that was already converted)
-        await tutor_chats_collection.update_one(
+        await get_tutor_chats_collection().update_one(
             {"_id": chat_id_obj},
             {
                 "$set": {
-                    "messages": messages
+                    "summary": response.choices[0].message.content,
+                    "summarizedCount": summarized_count
                 }
             }
         )
-        
-        return {
-            "result": EvaluationResult.PASS,
-            "feedback": assistant_content,
-            "hint": None,
-            "answerRevealed": False,
-            "chatId": chat_id,
-            "expectedAnswer": None,
-            "reason": None
-        }
-        
     except Exception as e:
-        logger.error(f"Error continuing chat: {e}")
-        raise Exception(f"Failed to continue chat: {str(e)}")
+        # The summary is an optimization; the next turn will retry
+        logger.error(f"Failed to summarize chat {chat_id_obj}: {e}")
 
 async def get_chat_history(user_id: str, chat_id: str) -> dict:
     """Get chat history by chatId"""
@@ -413,22 +822,46 @@ async def list_user_chats(user_id: str, limit: int = 50, offset: int = 0) -> Lis
     tutor_chats_collection = get_tutor_chats_collection()
     words_collection = get_words_collection()
     
-    # Get chats sorted by createdAt descending - exclude PENDING chats
-    chats = await tutor_chats_collection.find({
-        "userId": ObjectId(user_id),
-        "finalResult": {"$ne": ChatStatus.PENDING.value}  # Exclude PENDING chats
-    }).sort("createdAt", -1).skip(offset).limit(limit).to_list(length=limit)
+    # Get chats sorted by createdAt descending - exclude PENDING chats - and join
+    # each chat's word in MongoDB, returning only the fields the list needs
+    pipeline = [
+        {
+            "$match": {
+                "userId": ObjectId(user_id),
+                "finalResult": {"$ne": ChatStatus.PENDING.value}  # Exclude PENDING chats
+            }
+        },
+        {"$sort": {"createdAt": -1}},
+        {"$skip": offset},
+        {"$limit": limit},
+        {
+            "$lookup": {
+                "from": words_collection.name,
+                "localField": "wordId",
+                "foreignField": "_id",
+                "as": "word"
+            }
+        },
+        {"$unwind": {"path": "$word", "preserveNullAndEmptyArrays": True}},
+        {
+            "$project": {
+                "wordId": 1,
+                "taskType": 1,
+                "finalResult": 1,
+                "createdAt": 1,
+                "messageCount": {"$size": {"$ifNull": ["$messages", []]}},
+                "word.word": 1,
+                "word.meaning": 1
+            }
+        }
+    ]
+    chats = await tutor_chats_collection.aggregate(pipeline).to_list(length=limit)
     
-    # Get word information for each chat
     result = []
     for chat in chats:
         word_id = chat.get("wordId")
-        word = None
-        
-        if word_id:
-            word = await words_collection.find_one({"_id": word_id})
+        word = chat.get("word")
         
-        messages = chat.get("messages", [])
         result.append({
             "id": str(chat["_id"]),
             "wordId": str(word_id) if word_id else "",
@@ -437,7 +870,7 @@ async def list_user_chats(user_id: str, limit: int = 50, offset: int = 0) -> Lis
             "taskType": TaskType(chat.get("taskType")),
             "finalResult": ChatStatus(chat.get("finalResult", ChatStatus.FAIL.value)),
             "createdAt": chat.get("createdAt"),
-            "messageCount": len(messages)
+            "messageCount": chat.get("messageCount", 0)
         })
     
-    return result
\ No newline at end of file
+    return result
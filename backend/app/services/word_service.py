@@ -1,11 +1,19 @@
 from datetime import datetime
 from bson import ObjectId
 from fastapi import HTTPException, status
+from pymongo import ReturnDocument
 from pymongo.errors import DuplicateKeyError
 from app.database import get_words_collection
 from app.models.word import WordCreate, WordUpdate, WordResponse, Priority, State
 from typing import List, Optional
 
+# Shared fallback for words stored without failureStats; response builders must not mutate it
+_DEFAULT_FAILURE_STATS = {
+    "meaning": 0,
+    "sentence": 0,
+    "paragraph": 0
+}
+
 def normalize_word(word: str) -> str:
     """Normalize word to lowercase for uniqueness check"""
     return word.lower().strip()
@@ -15,18 +23,6 @@ async def create_word(user_id: str, word_data: WordCreate) -> dict:
     words_collection = get_words_collection()
     normalized = normalize_word(word_data.word)
     
-    # Check if word already exists for this user
-    existing = await words_collection.find_one({
-        "userId": ObjectId(user_id),
-        "normalizedWord": normalized
-    })
-    
-    if existing:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Word already exists"
-        )
-    
     # Validate priority
     if word_data.priority not in [1, 2, 3, 4]:
         raise HTTPException(
@@ -59,7 +55,7 @@ async def create_word(user_id: str, word_data: WordCreate) -> dict:
         result = await words_collection.insert_one(word_doc)
         word_doc["_id"] = result.inserted_id
     except DuplicateKeyError:
-        # Handle race condition where word was inserted between check and insert
+        # The unique (userId, normalizedWord) index rejects words the user already has
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Word already exists"
@@ -203,18 +199,6 @@ async def update_word(user_id: str, word_id: str, word_data: WordUpdate) -> dict
     """Update a word"""
     words_collection = get_words_collection()
     
-    # Check if word exists
-    word = await words_collection.find_one({
-        "_id": ObjectId(word_id),
-        "userId": ObjectId(user_id)
-    })
-    
-    if not word:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Word not found"
-        )
-    
     # Build update document
     update_doc = {"updatedAt": datetime.utcnow()}
     
@@ -231,13 +215,18 @@ async def update_word(user_id: str, word_id: str, word_data: WordUpdate) -> dict
         update_doc["priority"] = word_data.priority
         update_doc["lastPromotedAt"] = datetime.utcnow()
     
-    await words_collection.update_one(
-        {"_id": ObjectId(word_id)},
-        {"$set": update_doc}
+    updated_word = await words_collection.find_one_and_update(
+        {"_id": ObjectId(word_id), "userId": ObjectId(user_id)},
+        {"$set": update_doc},
+        return_document=ReturnDocument.AFTER
     )
     
-    # Fetch updated word
-    updated_word = await words_collection.find_one({"_id": ObjectId(word_id)})
+    if not updated_word:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Word not found"
+        )
+    
     return _word_doc_to_response(updated_word)
 
 async def delete_word(user_id: str, word_id: str) -> dict:
@@ -260,121 +249,100 @@ async def delete_word(user_id: str, word_id: str) -> dict:
 async def promote_word(user_id: str, word_id: str) -> dict:
     """Promote word priority (1->2->3->4)"""
     words_collection = get_words_collection()
+    word_filter = {"_id": ObjectId(word_id), "userId": ObjectId(user_id)}
+    now = datetime.utcnow()
     
-    word = await words_collection.find_one({
-        "_id": ObjectId(word_id),
-        "userId": ObjectId(user_id)
-    })
-    
-    if not word:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Word not found"
-        )
-    
-    current_priority = word["priority"]
-    if current_priority >= 4:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Word is already at maximum priority"
-        )
-    
-    new_priority = current_priority + 1
-    
-    await words_collection.update_one(
-        {"_id": ObjectId(word_id)},
+    updated_word = await words_collection.find_one_and_update(
+        {**word_filter, "priority": {"$lt": 4}},
         {
+            "$inc": {"priority": 1},
             "$set": {
-                "priority": new_priority,
-                "lastPromotedAt": datetime.utcnow(),
-                "updatedAt": datetime.utcnow()
+                "lastPromotedAt": now,
+                "updatedAt": now
             }
-        }
+        },
+        return_document=ReturnDocument.AFTER
     )
     
-    updated_word = await words_collection.find_one({"_id": ObjectId(word_id)})
+    if not updated_word:
+        await _raise_word_update_error(words_collection, word_filter, "Word is already at maximum priority")
+    
     return _word_doc_to_response(updated_word)
 
 async def demote_word(user_id: str, word_id: str) -> dict:
     """Demote word priority (4->3->2->1)"""
     words_collection = get_words_collection()
+    word_filter = {"_id": ObjectId(word_id), "userId": ObjectId(user_id)}
     
-    word = await words_collection.find_one({
-        "_id": ObjectId(word_id),
-        "userId": ObjectId(user_id)
-    })
-    
-    if not word:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Word not found"
-        )
-    
-    current_priority = word["priority"]
-    if current_priority <= 1:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Word is already at minimum priority"
-        )
-    
-    new_priority = current_priority - 1
-    
-    await words_collection.update_one(
-        {"_id": ObjectId(word_id)},
+    updated_word = await words_collection.find_one_and_update(
+        {**word_filter, "priority": {"$gt": 1}},
         {
-            "$set": {
-                "priority": new_priority,
-                "updatedAt": datetime.utcnow()
-            }
-        }
+            "$inc": {"priority": -1},
+            "$set": {"updatedAt": datetime.utcnow()}
+        },
+        return_document=ReturnDocument.AFTER
     )
     
-    updated_word = await words_collection.find_one({"_id": ObjectId(word_id)})
+    if not updated_word:
+        await _raise_word_update_error(words_collection, word_filter, "Word is already at minimum priority")
+    
     return _word_doc_to_response(updated_word)
 
 async def mark_mastered(user_id: str, word_id: str) -> dict:
     """Mark word as mastered (when masteryCount >= 3)"""
     words_collection = get_words_collection()
+    word_filter = {"_id": ObjectId(word_id), "userId": ObjectId(user_id)}
     
-    word = await words_collection.find_one({
-        "_id": ObjectId(word_id),
-        "userId": ObjectId(user_id)
-    })
-    
-    if not word:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Word not found"
-        )
-    
-    mastery_count = word.get("masteryCount", 0)
-    if mastery_count < 3:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Word needs 3 successful P4 completions before being marked as mastered"
-        )
-    
-    await words_collection.update_one(
-        {"_id": ObjectId(word_id)},
+    updated_word = await words_collection.find_one_and_update(
+        {**word_filter, "masteryCount": {"$gte": 3}},
         {
             "$set": {
                 "state": State.MASTERED.value,
                 "updatedAt": datetime.utcnow()
             }
-        }
+        },
+        return_document=ReturnDocument.AFTER
     )
     
-    updated_word = await words_collection.find_one({"_id": ObjectId(word_id)})
+    if not updated_word:
+        await _raise_word_update_error(
+            words_collection, word_filter,
+            "Word needs 3 successful P4 completions before being marked as mastered"
+        )
+    
     return _word_doc_to_response(updated_word)
 
 async def reintroduce_word(user_id: str, word_id: str) -> dict:
     """Reintroduce a mastered word back to active learning"""
     words_collection = get_words_collection()
+    word_filter = {"_id": ObjectId(word_id), "userId": ObjectId(user_id)}
+    
+    # Pipeline update so masteryCount can be decremented (floored at 0) server-side
+    updated_word = await words_collection.find_one_and_update(
+        {**word_filter, "state": State.MASTERED.value},
+        [
+            {
+                "$set": {
+                    "state": State.ACTIVE.value,
+                    "priority": 2,
+                    "masteryCount": {
+                        "$max": [0, {"$subtract": [{"$ifNull": ["$masteryCount", 0]}, 1]}]
+                    },
+                    "updatedAt": datetime.utcnow()
+                }
+            }
+        ],
+        return_document=ReturnDocument.AFTER
+    )
     
-    word = await words_collection.find_one({
-        "_id": ObjectId(word_id),
-        "userId": ObjectId(user_id)
-    })
+    if not updated_word:
+        await _raise_word_update_error(words_collection, word_filter, "Word is not in MASTERED state")
+    
+    return _word_doc_to_response(updated_word)
+
+async def _raise_word_update_error(words_collection, word_filter: dict, detail: str) -> None:
+    """Raise 404 if the word doesn't exist, otherwise 400 because its guard condition failed"""
+    word = await words_collection.find_one(word_filter, projection={"_id": 1})
     
     if not word:
         raise HTTPException(
@@ -382,28 +350,10 @@ async def reintroduce_word(user_id: str, word_id: str) -> dict:
             detail="Word not found"
         )
     
-    if word.get("state") != State.MASTERED.value:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Word is not in MASTERED state"
-        )
-    
-    mastery_count = max(0, word.get("masteryCount", 0) - 1)
-    
-    await words_collection.update_one(
-        {"_id": ObjectId(word_id)},
-        {
-            "$set": {
-                "state": State.ACTIVE.value,
-                "priority": 2,
-                "masteryCount": mastery_count,
-                "updatedAt": datetime.utcnow()
-            }
-        }
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=detail
     )
-    
-    updated_word = await words_collection.find_one({"_id": ObjectId(word_id)})
-    return _word_doc_to_response(updated_word)
 
 def _word_doc_to_response(word_doc: dict) -> dict:
     """Convert word document to response model"""
@@ -419,11 +369,7 @@ def _word_doc_to_response(word_doc: dict) -> dict:
         "masteryCount": word_doc.get("masteryCount", 0),
         "lastReviewedAt": word_doc.get("lastReviewedAt"),
         "lastPromotedAt": word_doc.get("lastPromotedAt"),
-        "failureStats": word_doc.get("failureStats", {
-            "meaning": 0,
-            "sentence": 0,
-            "paragraph": 0
-        }),
+        "failureStats": word_doc.get("failureStats", _DEFAULT_FAILURE_STATS),
         "createdAt": word_doc["createdAt"],
         "updatedAt": word_doc["updatedAt"]
     }
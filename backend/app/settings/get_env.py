@@ -1,54 +1,105 @@
 """
 Centralized environment variable exporter.
 All environment variables are loaded and exported from here.
+
+Values are read once, on first access, into a frozen Settings instance. Use
+get_settings() or import the setting names from this module directly.
 """
 import os
+from dataclasses import dataclass
+from functools import lru_cache
 from typing import List
 from dotenv import load_dotenv
 
-# Load environment variables from .env file
-load_dotenv()
-
-# Database
-MONGO_URI: str = os.getenv("MONGO_URI", "mongodb://localhost:27017/reverba")
-
-# Authentication
-ACCESS_TOKEN_SECRET: str = os.getenv("ACCESS_TOKEN_SECRET", "")
-REFRESH_TOKEN_SECRET: str = os.getenv("REFRESH_TOKEN_SECRET", "")
-JWT_ALGORITHM: str = os.getenv("JWT_ALGORITHM", "HS256")
-ACCESS_TOKEN_EXPIRE_MIN: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MIN", "15"))
-REFRESH_TOKEN_EXPIRE_DAYS: int = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30"))
-
-# OpenAI
-OPENAI_API_KEY: str = os.getenv("OPENAI_API_KEY", "")
-OPENAI_MODEL: str = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
-
-# Cron
-CRON_TIMEZONE: str = os.getenv("CRON_TIMEZONE", "Asia/Kolkata")
-
-# Email (Resend)
-RESEND_API_KEY: str = os.getenv("RESEND_API_KEY", "")
-RESEND_FROM_EMAIL: str = os.getenv("RESEND_FROM_EMAIL", "")
+@dataclass(frozen=True, slots=True)
+class Settings:
+    # Database (MONGO_POOL is the connection pool size for bulk scripts such as trigger_daily_tasks.py)
+    MONGO_URI: str
+    MONGO_POOL: int
+    
+    # Authentication
+    ACCESS_TOKEN_SECRET: str
+    REFRESH_TOKEN_SECRET: str
+    JWT_ALGORITHM: str
+    ACCESS_TOKEN_EXPIRE_MIN: int
+    REFRESH_TOKEN_EXPIRE_DAYS: int
+    
+    # OpenAI
+    OPENAI_API_KEY: str
+    OPENAI_MODEL: str
+    
+    # Tutor evaluation batching (off by default; a max batch size of 1 disables batching)
+    TUTOR_BATCH_MAX_SIZE: int
+    TUTOR_BATCH_WINDOW_MS: int
+    
+    # Cron (DAILY_TASK_CONCURRENCY users are processed at once)
+    CRON_TIMEZONE: str
+    DAILY_TASK_CONCURRENCY: int
+    
+    # Email (Resend)
+    RESEND_API_KEY: str
+    RESEND_FROM_EMAIL: str
+    
+    # Application
+    APP_SECRET_KEY: str
+    OTP_PEPPER: str
+    APP_ENV: str
+    CORS_ORIGINS: List[str]
 
-# Application
-APP_SECRET_KEY: str = os.getenv("APP_SECRET_KEY", "")
-APP_ENV: str = os.getenv("APP_ENV", "development")
-CORS_ORIGINS: List[str] = [
-    origin.strip() 
-    for origin in os.getenv("CORS_ORIGINS", "http://localhost:3000,http://localhost:5173").split(",")
-]
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Load environment variables (including the .env file) once and return the settings"""
+    load_dotenv()
+    
+    settings = Settings(
+        MONGO_URI=os.getenv("MONGO_URI", "mongodb://localhost:27017/reverba"),
+        MONGO_POOL=int(os.getenv("MONGO_POOL", "256")),
+        ACCESS_TOKEN_SECRET=os.getenv("ACCESS_TOKEN_SECRET", ""),
+        REFRESH_TOKEN_SECRET=os.getenv("REFRESH_TOKEN_SECRET", ""),
+        JWT_ALGORITHM=os.getenv("JWT_ALGORITHM", "HS256"),
+        ACCESS_TOKEN_EXPIRE_MIN=int(os.getenv("ACCESS_TOKEN_EXPIRE_MIN", "15")),
+        REFRESH_TOKEN_EXPIRE_DAYS=int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "30")),
+        OPENAI_API_KEY=os.getenv("OPENAI_API_KEY", ""),
+        OPENAI_MODEL=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
+        TUTOR_BATCH_MAX_SIZE=int(os.getenv("TUTOR_BATCH_MAX_SIZE", "1")),
+        TUTOR_BATCH_WINDOW_MS=int(os.getenv("TUTOR_BATCH_WINDOW_MS", "100")),
+        CRON_TIMEZONE=os.getenv("CRON_TIMEZONE", "Asia/Kolkata"),
+        DAILY_TASK_CONCURRENCY=int(os.getenv("DAILY_TASK_CONCURRENCY", "32")),
+        RESEND_API_KEY=os.getenv("RESEND_API_KEY", ""),
+        RESEND_FROM_EMAIL=os.getenv("RESEND_FROM_EMAIL", ""),
+        APP_SECRET_KEY=os.getenv("APP_SECRET_KEY", ""),
+        OTP_PEPPER=os.getenv("OTP_PEPPER", ""),
+        APP_ENV=os.getenv("APP_ENV", "development"),
+        CORS_ORIGINS=[
+            origin.strip()
+            for origin in os.getenv("CORS_ORIGINS", "http://localhost:3000,http://localhost:5173").split(",")
+        ]
+    )
+    
+    # Validate required environment variables
+    if settings.APP_ENV == "production":
+        required_vars = [
+            ("ACCESS_TOKEN_SECRET", settings.ACCESS_TOKEN_SECRET),
+            ("REFRESH_TOKEN_SECRET", settings.REFRESH_TOKEN_SECRET),
+            ("MONGO_URI", settings.MONGO_URI),
+            ("OPENAI_API_KEY", settings.OPENAI_API_KEY),
+            ("APP_SECRET_KEY", settings.APP_SECRET_KEY),
+            ("OTP_PEPPER", settings.OTP_PEPPER),
+            ("RESEND_API_KEY", settings.RESEND_API_KEY),
+        ]
+        
+        missing_vars = [var_name for var_name, var_value in required_vars if not var_value]
+        if missing_vars:
+            raise ValueError(f"Missing required environment variables in production: {', '.join(missing_vars)}")
+    
+    # A zero-sized semaphore would leave the daily task run waiting forever
+    if settings.DAILY_TASK_CONCURRENCY < 1:
+        raise ValueError("DAILY_TASK_CONCURRENCY must be at least 1")
+    
+    return settings
 
-# Validate required environment variables
-if APP_ENV == "production":
-    required_vars = [
-        ("ACCESS_TOKEN_SECRET", ACCESS_TOKEN_SECRET),
-        ("REFRESH_TOKEN_SECRET", REFRESH_TOKEN_SECRET),
-        ("MONGO_URI", MONGO_URI),
-        ("OPENAI_API_KEY", OPENAI_API_KEY),
-        ("APP_SECRET_KEY", APP_SECRET_KEY),
-        ("RESEND_API_KEY", RESEND_API_KEY),
-    ]
-    
-    missing_vars = [var_name for var_name, var_value in required_vars if not var_value]
-    if missing_vars:
-        raise ValueError(f"Missing required environment variables in production: {', '.join(missing_vars)}")
+def __getattr__(name: str):
+    """Resolve module-level setting names (e.g. `from app.settings.get_env import MONGO_URI`)"""
+    if name in Settings.__slots__:
+        return getattr(get_settings(), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
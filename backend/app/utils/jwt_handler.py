@@ -1,6 +1,9 @@
+import time
 from datetime import datetime, timedelta
 from typing import Optional
-from jose import JWTError, jwt
+import jwt
+from jwt import InvalidTokenError as JWTError
+from app.utils.ttl_cache import TTLCache
 from app.settings.get_env import (
     ACCESS_TOKEN_SECRET,
     REFRESH_TOKEN_SECRET,
@@ -9,6 +12,13 @@ from app.settings.get_env import (
     REFRESH_TOKEN_EXPIRE_DAYS
 )
 
+# Verified payloads keyed by the raw token, so repeated requests skip signature verification
+ACCESS_TOKEN_CACHE_TTL_SECONDS = 60
+REFRESH_TOKEN_CACHE_TTL_SECONDS = 300
+TOKEN_CACHE_MAX_SIZE = 10_000
+_access_token_cache = TTLCache(maxsize=TOKEN_CACHE_MAX_SIZE, ttl=ACCESS_TOKEN_CACHE_TTL_SECONDS)
+_refresh_token_cache = TTLCache(maxsize=TOKEN_CACHE_MAX_SIZE, ttl=REFRESH_TOKEN_CACHE_TTL_SECONDS)
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -31,20 +41,32 @@ def create_refresh_token(data: dict) -> str:
 
 def verify_access_token(token: str) -> Optional[dict]:
     """Verify and decode an access token"""
-    try:
-        payload = jwt.decode(token, ACCESS_TOKEN_SECRET, algorithms=[JWT_ALGORITHM])
-        if payload.get("type") != "access":
-            return None
-        return payload
-    except JWTError:
-        return None
+    return _verify_token(token, ACCESS_TOKEN_SECRET, "access", _access_token_cache)
 
 def verify_refresh_token(token: str) -> Optional[dict]:
     """Verify and decode a refresh token"""
+    return _verify_token(token, REFRESH_TOKEN_SECRET, "refresh", _refresh_token_cache)
+
+def invalidate_refresh_token(token: str) -> None:
+    """Drop a refresh token from the verification cache (e.g. on logout)"""
+    _refresh_token_cache.pop(token)
+
+def _verify_token(token: str, secret: str, token_type: str, cache: TTLCache) -> Optional[dict]:
+    """Decode a token, reusing a previously verified payload while it is unexpired"""
+    payload = cache.get(token)
+    if payload is not None:
+        if payload["exp"] > time.time():
+            return payload
+        cache.pop(token)
+        return None
+    
     try:
-        payload = jwt.decode(token, REFRESH_TOKEN_SECRET, algorithms=[JWT_ALGORITHM])
-        if payload.get("type") != "refresh":
-            return None
-        return payload
+        payload = jwt.decode(token, secret, algorithms=[JWT_ALGORITHM])
     except JWTError:
         return None
+    
+    if payload.get("type") != token_type:
+        return None
+    
+    cache.set(token, payload)
+    return payload
@@ -1,52 +1,221 @@
-import bcrypt
+import asyncio
 import hashlib
+import hmac
+import logging
+import os
+import ssl
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Union
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+from bcrypt import checkpw as _checkpw
+from blake3 import blake3 as _blake3
+from app.settings.get_env import OTP_PEPPER
+from app.utils.ttl_cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "hash_password",
+    "verify_password",
+    "verify_password_or_dummy",
+    "password_needs_rehash",
+    "hash_password_async",
+    "verify_password_async",
+    "hash_token",
+    "token_hash_candidates",
+    "verify_token",
+    "hash_tokens_batch",
+    "verify_tokens_batch",
+    "hash_otp",
+    "verify_otp",
+]
+
+# Bound once so the hashing hot paths skip module attribute lookups
+_sha256 = hashlib.sha256
+
+# Standard CPython builds (including the python:3.11-slim image) back hashlib.sha256 with
+# OpenSSL's EVP implementation, which already uses the CPU's SHA extensions when present.
+# The app leaves the root logger at WARNING, so only the slower builtin fallback is reported
+_SHA256_BACKEND = ssl.OPENSSL_VERSION if type(hashlib.sha256()).__module__ == "_hashlib" else "builtin"
+if _SHA256_BACKEND == "builtin":
+    logger.warning("SHA-256 backend (OTP and legacy token hashes): builtin; hashlib is not using OpenSSL")
+else:
+    logger.info(f"SHA-256 backend (OTP and legacy token hashes): {_SHA256_BACKEND}")
+
+_OTP_PEPPER = OTP_PEPPER.encode('utf-8')
+
+# Inputs longer than this are rejected before any encoding or hashing work is done
+_MAX_PASSWORD_LENGTH = 1024
+_MAX_TOKEN_LENGTH = 4096
+_MAX_OTP_LENGTH = 32
+
+# bcrypt only uses the first 72 bytes of a password (bcrypt 5 raises instead of truncating)
+_BCRYPT_MAX_PASSWORD_BYTES = 72
+
+def _check_length(value: Union[str, bytes], max_length: int, name: str) -> None:
+    """Raise ValueError if an input to be hashed is longer than max_length"""
+    if len(value) > max_length:
+        raise ValueError(f"{name} must be at most {max_length} characters")
+
+# New passwords are hashed with argon2id. bcrypt hashes stored before the migration still
+# verify and are replaced on the user's next login.
+_PASSWORD_HASHER = PasswordHasher(time_cost=3, memory_cost=64 * 1024, parallelism=4)
+
+# argon2 and bcrypt release the GIL while hashing, so worker threads run in parallel across cores
+_HASH_EXECUTOR = ThreadPoolExecutor(max_workers=os.cpu_count() or 1, thread_name_prefix="password-hash")
 
 def hash_password(password: str) -> str:
-    """Hash a password using bcrypt"""
-    # Encode password to bytes
-    password_bytes = password.encode('utf-8')
-    # Generate salt and hash password
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password_bytes, salt)
-    # Return as string
-    return hashed.decode('utf-8')
+    """Hash a password using argon2id"""
+    _check_length(password, _MAX_PASSWORD_LENGTH, "Password")
+    return _PASSWORD_HASHER.hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash"""
-    # Encode both to bytes
-    password_bytes = plain_password.encode('utf-8')
-    hashed_bytes = hashed_password.encode('utf-8')
-    # Verify password
-    return bcrypt.checkpw(password_bytes, hashed_bytes)
-
-def hash_token(token: str) -> str:
-    """Hash a token (e.g., refresh token) using SHA256"""
+    """Verify a password against its argon2 or bcrypt hash"""
+    _check_length(plain_password, _MAX_PASSWORD_LENGTH, "Password")
+    if _is_bcrypt_hash(hashed_password):
+        password_bytes = plain_password.encode('utf-8')[:_BCRYPT_MAX_PASSWORD_BYTES]
+        return _checkpw(password_bytes, hashed_password.encode('utf-8'))
+    
+    try:
+        return _PASSWORD_HASHER.verify(hashed_password, plain_password)
+    except (VerificationError, InvalidHashError):
+        return False
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Whether a stored hash predates the current scheme or parameters and should be replaced"""
+    if _is_bcrypt_hash(hashed_password):
+        return True
+    return _PASSWORD_HASHER.check_needs_rehash(hashed_password)
+
+def _is_bcrypt_hash(hashed_password: str) -> bool:
+    """bcrypt hashes use the $2a$/$2b$/$2y$ prefixes"""
+    return hashed_password.startswith("$2")
+
+# Checked instead of a real hash when the account doesn't exist, so unknown emails take as
+# long to reject as wrong passwords. This matches accounts already on argon2id; accounts still
+# holding a legacy bcrypt hash (cost 12) take longer to check until their next login rehashes
+# them, so until then an unknown email can still be told apart from a dormant legacy account.
+_DUMMY_PASSWORD_HASH = hash_password("dummy-password")
+
+def verify_password_or_dummy(plain_password: str, hashed_password: Optional[str]) -> bool:
+    """Verify a password, doing the same hashing work against a dummy hash if there is no hash"""
+    if hashed_password is None:
+        verify_password(plain_password, _DUMMY_PASSWORD_HASH)
+        return False
+    return verify_password(plain_password, hashed_password)
+
+async def hash_password_async(password: str) -> str:
+    """Hash a password in the hashing worker pool without blocking the event loop"""
+    return await asyncio.get_running_loop().run_in_executor(_HASH_EXECUTOR, hash_password, password)
+
+async def verify_password_async(plain_password: str, hashed_password: Optional[str]) -> bool:
+    """
+    Verify a password in the hashing worker pool without blocking the event loop.
+    
+    A missing hash (unknown user) is checked against a dummy hash and always fails.
+    """
+    return await asyncio.get_running_loop().run_in_executor(
+        _HASH_EXECUTOR, verify_password_or_dummy, plain_password, hashed_password
+    )
+
+# Token hashes are BLAKE3 digests marked with this prefix; unprefixed values are SHA-256 digests
+# stored by earlier versions
+_BLAKE3_TOKEN_PREFIX = b"$b3$"
+
+def hash_token(token: Union[str, bytes]) -> bytes:
+    """Hash a token (e.g., refresh token) to its prefixed 32-byte BLAKE3 digest"""
     # JWT tokens can be longer than bcrypt's 72-byte limit
-    # Use SHA256 which has no length limit
-    token_bytes = token.encode('utf-8')
-    hashed = hashlib.sha256(token_bytes).hexdigest()
-    return hashed
+    # Use BLAKE3 which has no length limit
+    return _BLAKE3_TOKEN_PREFIX + _blake3(_token_bytes(token)).digest()
+
+def token_hash_candidates(token: Union[str, bytes]) -> List[Union[bytes, str]]:
+    """
+    Stored forms a token's hash may have, for lookups while older rows are migrated.
+    
+    Refresh token hashes used to be SHA-256 digests, stored as hex strings before that
+    (see migrate_token_hashes.py).
+    """
+    token_bytes = _token_bytes(token)
+    legacy_hash = _sha256(token_bytes).digest()
+    return [hash_token(token_bytes), legacy_hash, legacy_hash.hex()]
 
-def verify_token(plain_token: str, hashed_token: str) -> bool:
+def _token_bytes(token: Union[str, bytes]) -> bytes:
+    """Return the token as bytes, encoding it if needed"""
+    _check_length(token, _MAX_TOKEN_LENGTH, "Token")
+    return token if isinstance(token, bytes) else _encode_token(token)
+
+def _matches_token_hash(plain_token: Union[str, bytes], hashed_token: Union[bytes, str]) -> bool:
+    """Compare a token with a BLAKE3 or legacy SHA-256 hash in constant time"""
+    if isinstance(hashed_token, str):
+        # Legacy hex-string SHA-256 hash not yet converted by migrate_token_hashes.py
+        try:
+            hashed_token = bytes.fromhex(hashed_token)
+        except ValueError:
+            return False
+    if hashed_token.startswith(_BLAKE3_TOKEN_PREFIX):
+        token_hash = hash_token(plain_token)
+    else:
+        token_hash = _sha256(_token_bytes(plain_token)).digest()
+    return hmac.compare_digest(token_hash, hashed_token)
+
+def _encode_token(token: str) -> bytes:
+    """Encode a token to bytes; JWTs are ASCII (base64url), other input falls back to UTF-8"""
+    try:
+        return token.encode('ascii')
+    except UnicodeEncodeError:
+        return token.encode('utf-8')
+
+# Recent verify_token results; the check is a pure function of its inputs, so a cached
+# result can't go stale (revocation is tracked on the refresh token document instead)
+TOKEN_VERIFY_CACHE_TTL_SECONDS = 60
+TOKEN_VERIFY_CACHE_MAX_SIZE = 4096
+_token_verify_cache = TTLCache(maxsize=TOKEN_VERIFY_CACHE_MAX_SIZE, ttl=TOKEN_VERIFY_CACHE_TTL_SECONDS)
+_token_verify_lock = threading.Lock()
+
+def verify_token(plain_token: Union[str, bytes], hashed_token: Union[bytes, str]) -> bool:
     """Verify a token against its hash"""
-    # Hash the plain token and compare
-    token_hash = hash_token(plain_token)
-    return token_hash == hashed_token
+    key = (plain_token, hashed_token)
+    with _token_verify_lock:
+        cached = _token_verify_cache.get(key)
+    if cached is not None:
+        return cached
+    
+    # Hash the plain token and compare in constant time
+    result = _matches_token_hash(plain_token, hashed_token)
+    with _token_verify_lock:
+        _token_verify_cache.set(key, result)
+    return result
+
+def hash_tokens_batch(tokens: List[Union[str, bytes]]) -> List[bytes]:
+    """Hash several tokens, e.g. when checking a list of sessions"""
+    return [hash_token(token) for token in tokens]
+
+def verify_tokens_batch(plain_tokens: List[Union[str, bytes]], hashed_tokens: List[Union[bytes, str]]) -> List[bool]:
+    """
+    Verify tokens against their hashes pairwise, comparing each in constant time.
+    
+    Raises ValueError if the two lists differ in length.
+    """
+    return [
+        _matches_token_hash(plain_token, hashed_token)
+        for plain_token, hashed_token in zip(plain_tokens, hashed_tokens, strict=True)
+    ]
 
 def hash_otp(otp: str) -> str:
-    """Hash an OTP using bcrypt"""
-    # Encode OTP to bytes
+    """Hash an OTP using HMAC-SHA256 keyed with the server-side pepper"""
+    # A 6-digit code has too little entropy for bcrypt's work factor to slow down brute
+    # force; the secret pepper and the per-OTP attempt limit protect it instead
+    _check_length(otp, _MAX_OTP_LENGTH, "OTP")
     otp_bytes = otp.encode('utf-8')
-    # Generate salt and hash OTP
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(otp_bytes, salt)
-    # Return as string
-    return hashed.decode('utf-8')
+    return hmac.new(_OTP_PEPPER, otp_bytes, _sha256).hexdigest()
 
 def verify_otp(plain_otp: str, hashed_otp: str) -> bool:
     """Verify an OTP against its hash"""
-    # Encode both to bytes
-    otp_bytes = plain_otp.encode('utf-8')
-    hashed_bytes = hashed_otp.encode('utf-8')
-    # Verify OTP
-    return bcrypt.checkpw(otp_bytes, hashed_bytes)
\ No newline at end of file
+    _check_length(plain_otp, _MAX_OTP_LENGTH, "OTP")
+    # OTPs issued before the switch to HMAC are bcrypt hashes
+    if hashed_otp.startswith("$2"):
+        return _checkpw(plain_otp.encode('utf-8'), hashed_otp.encode('utf-8'))
+    
+    return hmac.compare_digest(hash_otp(plain_otp).encode('ascii'), hashed_otp.encode('ascii'))
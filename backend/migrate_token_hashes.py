@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+One-off migration converting refresh token hashes stored as hex strings into raw
+SHA-256 digests (BSON binary). New tokens are hashed with BLAKE3; the binary SHA-256
+form stays valid until those tokens expire.
+
+Refresh and logout still match the legacy hex form, so this can run after deploying.
+Running it again only touches rows that are still strings.
+
+Usage:
+    python migrate_token_hashes.py
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+env_path = Path(__file__).parent / '.env'
+load_dotenv(dotenv_path=env_path)
+
+# Add the parent directory to the path so we can import app modules
+backend_dir = Path(__file__).parent
+sys.path.insert(0, str(backend_dir))
+
+from pymongo import UpdateOne
+from app.database import connect_to_mongo, close_mongo_connection, get_refresh_tokens_collection
+import logging
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+
+
+async def main():
+    """Convert every hex tokenHash to its binary digest"""
+    try:
+        logger.info("Connecting to MongoDB...")
+        await connect_to_mongo()
+
+        refresh_tokens_collection = get_refresh_tokens_collection()
+        cursor = refresh_tokens_collection.find(
+            {"tokenHash": {"$type": "string"}},
+            projection={"tokenHash": 1}
+        )
+
+        migrated = 0
+        operations = []
+        async for token_doc in cursor:
+            operations.append(UpdateOne(
+                {"_id": token_doc["_id"], "tokenHash": token_doc["tokenHash"]},
+                {"$set": {"tokenHash": bytes.fromhex(token_doc["tokenHash"])}}
+            ))
+            if len(operations) >= BATCH_SIZE:
+                result = await refresh_tokens_collection.bulk_write(operations, ordered=False)
+                migrated += result.modified_count
+                operations = []
+
+        if operations:
+            result = await refresh_tokens_collection.bulk_write(operations, ordered=False)
+            migrated += result.modified_count
+
+        logger.info(f"Migrated {migrated} refresh token hash(es) to binary")
+
+    except Exception as e:
+        logger.error(f"Error during token hash migration: {e}", exc_info=True)
+        sys.exit(1)
+    finally:
+        logger.info("Closing MongoDB connection...")
+        await close_mongo_connection()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
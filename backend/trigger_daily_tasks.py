@@ -25,6 +25,7 @@ backend_dir = Path(__file__).parent
 sys.path.insert(0, str(backend_dir))
 
 from app.database import connect_to_mongo, close_mongo_connection
+from app.settings.get_env import MONGO_POOL
 from app.services.cron_service import generate_daily_tasks
 import logging
 
@@ -43,7 +44,8 @@ async def main():
         
         # Connect to MongoDB
         logger.info("Connecting to MongoDB...")
-        await connect_to_mongo()
+        # Users are processed concurrently, so allow a larger pool than the API server's
+        await connect_to_mongo(max_pool_size=MONGO_POOL)
         logger.info("Connected to MongoDB successfully")
         
         # Generate daily tasks for all users
@@ -63,4 +65,10 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    # Use uvloop's libuv event loop when available (it isn't supported on Windows)
+    try:
+        import uvloop
+    except ImportError:
+        asyncio.run(main())
+    else:
+        uvloop.run(main())